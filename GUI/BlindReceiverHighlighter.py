@@ -1,4 +1,7 @@
 import re
+import csv
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
@@ -6,23 +9,41 @@ from reportlab.lib import colors
 import webbrowser
 import os
 
+# Highlight levels, a higher number wins when a row is flagged more than once
+HIGHLIGHT_PRIORITY = {'YELLOW': 1, 'ORANGE': 2, 'RED': 3}
+
 class BFHighlighter:
-    def __init__(self, rpt_file_path):
+    def __init__(self, rpt_file_path, write_txt_copy=False):
         self.TIME_PATTERN = re.compile(r'\d{1,2}:\d{2}')  # Regex to find time in format H:MM or HH:MM
         self.QUANTITY_PATTERN = re.compile(r'\s+\d+\s+\d+\s+\d+\s*$')  # Regex to match lines with quantities at the end
         self.START_PATTERN = re.compile(r'^\s*\d{6}')  # Regex to match lines starting with a 6-digit number
         self.LOCATION_ID_PATTERN = re.compile(r'\s+(?:\d+|D\d+|T\d+)\s*$')  # Regex to match location IDs
         self.EXCLAMATION_PATTERN = re.compile(r'!')  # start with !
+        self.TRAILING_NUMBER_PATTERN = re.compile(r'(\d+)\s*$')  # Regex to match the difference at the end of quantity rows
         self.rpt_file_path = rpt_file_path
-        self.red_rows = []
-        self.orange_rows = []
-        self.yellow_rows = []
-        self.crossed_rows = []
+        self.highlighted_rows = {} # line index -> 'RED', 'ORANGE' or 'YELLOW', highest priority wins
+        self.crossed_rows = set() # line indices of inaccessible locations
         self.pos_quant_indices = []
         self.neg_quant_indices = []
         self.even_quant_indices = []
+        self.section_starts = [] # sorted indices of every section's quantity row
+        self.section_names = [] # 'Pos', 'Even' or 'Neg', parallel to section_starts
+        # Row table filled in by updateIndices, one entry per line of the report
+        self.row_kinds = [] # 'Quantity', 'Timestamped' or 'Other'
+        self.row_minutes = [] # minutes since midnight of the row's time stamp, or None
+        self.row_sections = [] # section the row belongs to, or None
+        self.row_pallet_sizes = [] # pallet size of timestamped rows, or None
+        self.row_quantities = [] # (received, order, diff) of quantity rows, or None
+        self.pos_row_minutes = [] # sorted times of the timestamped rows in positive sections
+        self.pos_row_indices = [] # line indices parallel to pos_row_minutes
+        self.partial_pos_rows = [] # partial pallet rows within positive sections
+        self.last_partial_row = None # last partial pallet row in the whole report
+        self.low_priority_rows = None # text of partial_pos_rows, set once they have been highlighted
         self.txt_file_name = "./Data_Analysis_Suite_Output_Files/Blind_Receiver_orig.txt"
-        self.rpt_to_txt(rpt_file_path)
+        self.lines = self.read_rpt(rpt_file_path) # the report is read once and shared by every stage below
+        if write_txt_copy:
+            self.rpt_to_txt() # plain text copy of the report, only needed for debugging
+        self.updatedCrossedOutRows()
         self.updateIndices() #update indices of even, odd, and negative sections
 
 
@@ -39,20 +60,44 @@ class BFHighlighter:
         except ValueError:
             return None
 
+    @staticmethod
+    def parse_minutes(time_str):
+        """
+        Parse the time in the format "H:MM" into minutes since midnight.
+
+        :param time_str: The time string to parse.
+        :return: The number of minutes, or None if the time is not valid.
+        """
+        hours, minutes = time_str.split(':')
+        hours, minutes = int(hours), int(minutes)
+        if hours > 23 or minutes > 59:
+            return None
+        return hours * 60 + minutes
+
     def determine_section(self, index):
-        a_indices = self.pos_quant_indices
-        b_indices = self.even_quant_indices
-        c_indices = self.neg_quant_indices
-        # Combine the indices with section identifiers
-        sections = [(i, 'Pos') for i in a_indices] + [(i, 'Even') for i in b_indices] + [(i, 'Neg') for i in c_indices]
-        # Sort the combined list by indices
-        sections.sort()
-        current_section = None
-        for i, section in sections:
-            if index < i:
-                break
-            current_section = section
-        return current_section
+        """
+        Look up the section (Pos, Even or Neg) that a line belongs to.
+
+        :param index: The line index in the file.
+        :return: The name of the closest section starting at or before the index, or None.
+        """
+        position = bisect_right(self.section_starts, index)
+        if position == 0:
+            return None
+        return self.section_names[position - 1]
+
+    def next_section_start(self, index, default=None):
+        """
+        Find the first section quantity row strictly after the given index.
+
+        :param index: The line index in the file.
+        :param default: Value returned when no later section exists.
+        :return: The index of the next section's quantity row, or default.
+        """
+        position = bisect_right(self.section_starts, index)
+        if position == len(self.section_starts):
+            return default
+        return self.section_starts[position]
 
     def extract_quantities(self, line):
         """
@@ -104,121 +149,123 @@ class BFHighlighter:
         :param start_index: The starting index to search around.
         :return: A tuple of three lists: medium_priority_rows, high_priority_row, low_priority_rows
         """
-        full_pallet_rows_with_times = []
-        partial_pallet_rows_with_times = []
-        pos_sec_rows_with_times = []
-
-        # Find valid timestamped rows
-        for idx, line in enumerate(lines):
-            if self.isTimestampedRow(line):
-                if self.determine_section(idx) == "Pos":
-                    pos_sec_rows_with_times.append((line, self.parse_time(self.TIME_PATTERN.search(line).group())))
-                else:
-                  full_pallet_rows_with_times.append((line, self.parse_time(self.TIME_PATTERN.search(line).group())))
-
         # Get the target time from the start index
-        time_match = self.TIME_PATTERN.search(lines[start_index])
-        if time_match:
-            target_time = self.parse_time(time_match.group())
-        else:
+        target_minutes = self.row_minutes[start_index]
+        if target_minutes is None:
             # print("ERROR: CURRENT ROW DOES NOT HAVE TIME STAMP")
             return [], [lines[start_index]], []
 
-        print("Time of Mixed Event: ", target_time.strftime("%H:%M"))
-
-        # Calculate Previous Timestamps in positive sections
-        # Filter lines where the time is greater than the target time
-        filtered_lines = []
-        for line, time in pos_sec_rows_with_times:
-            if time < target_time:
-                filtered_lines.append(line)
-
-        sorted_filtered_lines = sorted(
-            filtered_lines,
-            key=lambda x: self.parse_time(self.TIME_PATTERN.search(x).group())
-        )
-
-        previous_rows = []
-        previous_rows = sorted_filtered_lines[-2:]
-        medium_priority_rows = []
-        high_priority_row = []
-
-        if(len(previous_rows)==2):
-            high_priority_row.append(previous_rows[1])
-            medium_priority_rows.append(previous_rows[0])
-        elif(len(previous_rows)==1):
-            high_priority_row.append(previous_rows[0])
-        else:
-            high_priority_row = []
-            medium_priority_rows = []
-
-        # Calculate Future Timestamps in positive sections
-        filtered_lines = []
-        for line, time in pos_sec_rows_with_times:
-            if time > target_time:
-                filtered_lines.append(line)
-        sorted_filtered_lines = sorted(
-            filtered_lines,
-            key=lambda x: self.parse_time(self.TIME_PATTERN.search(x).group())
-        )
+        print("Time of Mixed Event: ", f"{target_minutes // 60:02d}:{target_minutes % 60:02d}")
 
-        future_rows = []
-        if sorted_filtered_lines:
-            future_rows = sorted_filtered_lines[0]
+        # The two positive section rows chronologically prior to the mixed event
+        position = bisect_left(self.pos_row_minutes, target_minutes)
+        previous_indices = self.pos_row_indices[max(position - 2, 0):position]
+        medium_priority_indices = []
+        high_priority_indices = []
 
-        # if(len(future_rows) > 0):
-            # medium_priority_rows.append(future_rows) #future rows after mixed may not need to be checked per say
+        if(len(previous_indices)==2):
+            high_priority_indices.append(previous_indices[1])
+            medium_priority_indices.append(previous_indices[0])
+        elif(len(previous_indices)==1):
+            high_priority_indices.append(previous_indices[0])
 
-        for line, time in pos_sec_rows_with_times:
-            pallet_size = self.extract_pallet_size(line)
-            if not(pallet_size % 6 == 0):
-                partial_pallet_rows_with_times.append(line)
-
-        low_priority_rows = partial_pallet_rows_with_times
+        # future rows after mixed may not need to be checked per say, they start at bisect_right(self.pos_row_minutes, target_minutes)
 
         # Ensure high_priority_row is set correctly if there are no positive sections
         if len(self.pos_quant_indices) == 0:
-            filtered_indices = []
-            for idx, line in enumerate(lines):
-                if self.isTimestampedRow(line) and not(self.extract_pallet_size(line) % 6 == 0):
-                    filtered_indices.append(idx)
-                if len(filtered_indices) > 0:
-                  last_timestamped_row = max(filtered_indices)
-                else:
-                  last_timestamped_row = start_index
-              # last_timestamped_row = max(idx for idx, line in enumerate(lines) if self.isTimestampedRow(line) and not(self.extract_pallet_size(line) % 6 ==0) ) #self.TIME_PATTERN.search(line) and (self.START_PATTERN.search(line) or self.EXCLAMATION_PATTERN.search(line))) #the last timestamped row
-            if start_index > max(self.neg_quant_indices + self.pos_quant_indices + self.even_quant_indices):
+            last_timestamped_row = self.last_partial_row if self.last_partial_row is not None else start_index
+            last_index = None
+            if start_index > self.section_starts[-1]:
                 last_index = last_timestamped_row
-            next_index = min(
-                [index for index in self.neg_quant_indices + self.pos_quant_indices + self.even_quant_indices if index > start_index],
-                default=None
-            )
+            next_index = self.next_section_start(start_index)
             if next_index:
-                high_priority_row.append(lines[next_index - 1])
+                high_priority_indices.append(next_index - 1)
             elif last_index:
-                high_priority_row.append(lines[last_index])
+                high_priority_indices.append(last_index)
             else:
-                high_priority_row.append(lines[start_index])
-
-        self.red_rows.extend(high_priority_row)
-        self.orange_rows.extend(medium_priority_rows)
-        self.yellow_rows.extend(low_priority_rows)
+                high_priority_indices.append(start_index)
+
+        self.mark_rows(high_priority_indices, 'RED')
+        self.mark_rows(medium_priority_indices, 'ORANGE')
+        # Partial pallets in positive sections do not depend on the mixed event, so they are only flagged once
+        if self.low_priority_rows is None:
+            self.mark_rows(self.partial_pos_rows, 'YELLOW')
+            self.low_priority_rows = [lines[idx] for idx in self.partial_pos_rows]
+        medium_priority_rows = [lines[idx] for idx in medium_priority_indices]
+        high_priority_row = [lines[idx] for idx in high_priority_indices]
+        low_priority_rows = self.low_priority_rows
         return medium_priority_rows, high_priority_row, low_priority_rows
 
+    def mark_rows(self, indices, level):
+        """
+        Records the highlight level of each row, keeping the highest priority when a row is flagged more than once
+
+        :param indices: The line indices to highlight.
+        :param level: 'RED', 'ORANGE' or 'YELLOW'.
+        """
+        priority = HIGHLIGHT_PRIORITY[level]
+        for idx in indices:
+            current = self.highlighted_rows.get(idx)
+            if current is None or HIGHLIGHT_PRIORITY[current] < priority:
+                self.highlighted_rows[idx] = level
+
     def updateIndices(self):
-        with open(self.txt_file_name, 'r') as txt_file:
-            lines = txt_file.readlines()
-            for i, line in enumerate(lines):
-                if self.isQuantityRow(line):
-                    received_qty, order_qty, diff_qty = self.extract_quantities(line)
-                    if received_qty < order_qty:
-                        self.neg_quant_indices.append(i)
-                    elif received_qty > order_qty:
-                        self.pos_quant_indices.append(i)
-                    else:
-                        self.even_quant_indices.append(i)
-
-    def find_highlight_rows(self, txt_filename):
+        """
+        Parses every line of the report once into a row table (line kind, minutes since midnight, section,
+        pallet size and quantities), along with the section boundaries and a time sorted index of the
+        timestamped rows in positive sections
+        """
+        lines = self.lines
+        section = None
+        pos_rows = []
+        for i, line in enumerate(lines):
+            time_match = self.TIME_PATTERN.search(line)
+            minutes = self.parse_minutes(time_match.group()) if time_match else None
+            quantities = None
+            pallet_size = None
+            if self.isQuantityRow(line):
+                kind = 'Quantity'
+                quantities = self.extract_quantities(line)
+                received_qty, order_qty, diff_qty = quantities
+                if received_qty < order_qty:
+                    self.neg_quant_indices.append(i)
+                    section = 'Neg'
+                elif received_qty > order_qty:
+                    self.pos_quant_indices.append(i)
+                    section = 'Pos'
+                else:
+                    self.even_quant_indices.append(i)
+                    section = 'Even'
+                self.section_starts.append(i)
+                self.section_names.append(section)
+            elif self.isTimestampedRow(line):
+                kind = 'Timestamped'
+                try:
+                    pallet_size = self.extract_pallet_size(line)
+                except ValueError:
+                    pallet_size = None
+                is_partial = pallet_size is not None and pallet_size % 6 != 0
+                if is_partial:
+                    self.last_partial_row = i
+                if section == 'Pos':
+                    if is_partial:
+                        self.partial_pos_rows.append(i)
+                    if minutes is not None:
+                        pos_rows.append((minutes, i))
+            else:
+                kind = 'Other'
+            self.row_kinds.append(kind)
+            self.row_minutes.append(minutes)
+            self.row_sections.append(section)
+            self.row_pallet_sizes.append(pallet_size)
+            self.row_quantities.append(quantities)
+
+        # Sorting on (minutes, index) keeps rows with equal times in file order
+        pos_rows.sort()
+        self.pos_row_minutes = [minutes for minutes, i in pos_rows]
+        self.pos_row_indices = [i for minutes, i in pos_rows]
+
+    def find_highlight_rows(self):
         """
         Finds the rows where received quantity is less than order quantity and then returns the high, medium, and low priority rows with respect to that information
         Note: the terms "previous" "current" and "future" are depracted, they refer to medium, high, and low priority respectively
@@ -226,100 +273,73 @@ class BFHighlighter:
         medium_priority_rows = []
         high_priority_row = []
         low_priority_rows = []
-        with open(txt_filename, 'r') as txt_file:
-            lines = txt_file.readlines()
-
-            if len(self.neg_quant_indices) == 0: #no negative sections were found
-                for i, line in enumerate(lines):
-                    if self.isQuantityRow(line) and self.determine_section(i) == "Pos":
-                        if i + 1 < len(lines):  # make sure that current line is not the last line
-                            i += 1
-                            next_index = min(
-                            [index for index in self.neg_quant_indices + self.pos_quant_indices + self.even_quant_indices if index > i],
-                            default=i
-                            )
-                            medium_priority_rows, high_priority_row, low_priority_rows  = self.update_colored_rows(lines, next_index)
-            else:
-                for i, line in enumerate(lines):
-                    if self.isQuantityRow(line):
-                        received_qty, order_qty, diff_qty = self.extract_quantities(line)
-                        if received_qty is not None and order_qty is not None and received_qty < order_qty: #is a negative quantity
-                            if i + 1 < len(lines):  
-                                i += 1
-                                medium_priority_rows, high_priority_row, low_priority_rows  = self.update_colored_rows(lines, i)
-
+        lines = self.lines
+
+        if len(self.neg_quant_indices) == 0: #no negative sections were found
+            for i in self.pos_quant_indices:
+                if i + 1 < len(lines):  # make sure that current line is not the last line
+                    i += 1
+                    next_index = self.next_section_start(i, default=i)
+                    medium_priority_rows, high_priority_row, low_priority_rows  = self.update_colored_rows(lines, next_index)
+        else:
+            for i in self.neg_quant_indices: #is a negative quantity
+                if i + 1 < len(lines):  
+                    i += 1
+                    medium_priority_rows, high_priority_row, low_priority_rows  = self.update_colored_rows(lines, i)
 
         return medium_priority_rows, high_priority_row , low_priority_rows
 
-    def highlight_rows_in_pdf(self, txt_filename, pdf_filename):
+    def format_rows(self):
         """
-        Highlights and crosses out rows as appropriate
+        Builds the text of every row as it appears in the PDF, with signed differences on quantity rows,
+        indents on timestamped rows and asterisks in place of the indent on highlighted rows.
+
+        :return: The list of rendered rows, one per line of the report.
         """
         indent = "          "
-        big_indent = ""
-        crossed_rows = self.crossed_rows
-        previous_rows, current_row, future_rows = self.find_highlight_rows(txt_filename)
-        
-        indent_length = len(indent)  # Length of the original indentation
         asterisk_indent = "*** "  # Indent with asterisks for high-priority (red) rows
-
-        c = canvas.Canvas(pdf_filename, pagesize=letter)
-        width, height = letter
-        c.setFont("Courier", 10)  # Use a monospaced font
-
-        with open(txt_filename, 'r') as txt_file:
-            y_position = height - 40
-            line_height = 12
-
-            for line in txt_file:
-                line_with_diff = line
-                if self.isQuantityRow(line):
-                    # Extract quantities and calculate diff_qty
-                    quantities = re.findall(r'\d+', line)
-                    if len(quantities) >= 3:
-                        received_qty = int(quantities[-2])
-                        order_qty = int(quantities[-3])
-                        diff_qty = int(quantities[-1])
-                        if received_qty > order_qty:
-                            diff_sign = "+"
-                        elif received_qty < order_qty:
-                            diff_sign = "-"
-                        else:
-                            diff_sign = ""
-                        diff_qty_str = f"{diff_sign}{diff_qty}"
-                        # Reconstruct the line with the diff_qty with sign
-                        line_with_diff = re.sub(r'(\d+)\s*$', diff_qty_str, line)
-                    line_with_indent = line_with_diff
-                elif self.isTimestampedRow(line):
-                    line_with_indent = indent + line.strip()
-                elif "Acceptance" in line:
-                    line_with_indent = indent + line.strip()
+        rendered_rows = []
+
+        for i, line in enumerate(self.lines):
+            kind = self.row_kinds[i]
+            if kind == 'Quantity':
+                # Reconstruct the line with the diff_qty with sign
+                received_qty, order_qty, diff_qty = self.row_quantities[i]
+                if received_qty > order_qty:
+                    diff_sign = "+"
+                elif received_qty < order_qty:
+                    diff_sign = "-"
                 else:
-                    line_with_indent = line.strip()
-
-                # Replace part of the indent with asterisks based on priority level
-                if line in self.red_rows:
-                    line_with_indent = asterisk_indent + line_with_indent[len(asterisk_indent):]  # Replace beginning of indent with "***"
-                elif line in self.orange_rows:
-                    line_with_indent = "** " + line_with_indent[3:]  # Replace beginning of indent with "**"
-                elif line in self.yellow_rows:
-                    line_with_indent = "* " + line_with_indent[2:]  # Replace beginning of indent with "*"
-
-                if line in crossed_rows:
-                    c.setFillColor(colors.black)
-                    c.setLineWidth(1)  # Set line width for crossing out
-                    offset = 2
-                    c.line(30, y_position + line_height / 2 - offset, width, y_position + line_height / 2 - offset)
-
-                c.drawString(30, y_position, line_with_indent)
-                y_position -= line_height
-
-                if y_position < 40:
-                    c.showPage()
-                    c.setFont("Courier", 10)
-                    y_position = height - 40
+                    diff_sign = ""
+                line_with_indent = self.TRAILING_NUMBER_PATTERN.sub(f"{diff_sign}{diff_qty}", line)
+            elif kind == 'Timestamped':
+                line_with_indent = indent + line.strip()
+            elif "Acceptance" in line:
+                line_with_indent = indent + line.strip()
+            else:
+                line_with_indent = line.strip()
+
+            # Replace part of the indent with asterisks based on priority level
+            level = self.highlighted_rows.get(i)
+            if level == 'RED':
+                line_with_indent = asterisk_indent + line_with_indent[len(asterisk_indent):]  # Replace beginning of indent with "***"
+            elif level == 'ORANGE':
+                line_with_indent = "** " + line_with_indent[3:]  # Replace beginning of indent with "**"
+            elif level == 'YELLOW':
+                line_with_indent = "* " + line_with_indent[2:]  # Replace beginning of indent with "*"
+            rendered_rows.append(line_with_indent)
+        return rendered_rows
+
+    def highlight_rows_in_pdf(self, pdf_filename, highlighted_pages_only=False):
+        """
+        Highlights and crosses out rows as appropriate.
+
+        :param pdf_filename: Where to write the PDF.
+        :param highlighted_pages_only: Only render the pages that contain a RED, ORANGE or YELLOW row.
+        """
+        previous_rows, current_row, future_rows = self.find_highlight_rows()
+        self.render_pdf(self.format_rows(), pdf_filename, highlighted_pages_only)
 
-        c.save()
         for row in current_row:
             print("[RED] Likely Mixed Event Occurence: ", row)
         for row in previous_rows:
@@ -327,24 +347,93 @@ class BFHighlighter:
         for row in future_rows:
             print("[YELLOW] Partial Pallet in Positive Section: ", row)
 
+    def render_pdf(self, rendered_rows, pdf_filename, highlighted_pages_only=False):
+        """
+        Writes the rendered rows to the PDF, crossing out inaccessible locations.
+        Pagination is computed up front, each page is laid out as a single text object and its strike-throughs are drawn together.
+
+        :param rendered_rows: The rows returned by format_rows.
+        :param pdf_filename: Where to write the PDF.
+        :param highlighted_pages_only: Only render the pages that contain a RED, ORANGE or YELLOW row.
+        """
+        c = canvas.Canvas(pdf_filename, pagesize=letter)
+        width, height = letter
+        top_margin = bottom_margin = 40
+        line_height = 12
+        offset = 2
+        lines_per_page = int((height - top_margin - bottom_margin) // line_height) + 1
+
+        page_starts = range(0, len(rendered_rows), lines_per_page)
+        if highlighted_pages_only:
+            highlighted_pages = {i // lines_per_page for i in self.highlighted_rows}
+            page_starts = [start for start in page_starts if start // lines_per_page in highlighted_pages]
+
+        for page_number, page_start in enumerate(page_starts):
+            if page_number > 0:
+                c.showPage()
+            page_end = min(page_start + lines_per_page, len(rendered_rows))
+
+            text = c.beginText(30, height - top_margin)
+            text.setFont("Courier", 10)  # Use a monospaced font
+            text.setLeading(line_height)
+            for i in range(page_start, page_end):
+                text.textLine(rendered_rows[i])
+            c.drawText(text)
+
+            strike_throughs = []
+            for i in range(page_start, page_end):
+                if i in self.crossed_rows:
+                    y_position = height - top_margin - (i - page_start) * line_height
+                    strike_throughs.append((30, y_position + line_height / 2 - offset, width, y_position + line_height / 2 - offset))
+            if strike_throughs:
+                c.setStrokeColor(colors.black)
+                c.setLineWidth(1)  # Set line width for crossing out
+                c.lines(strike_throughs)
+
+        c.save()
+
+    @staticmethod
+    def read_rpt(rpt_filename):
+        """
+        Reads every line of a .rpt file into memory, keeping the row structure.
+        """
+        with open(rpt_filename, 'r') as rpt_file:
+            return rpt_file.readlines()
+
     @staticmethod
-    def convert_rpt_to_txt(rpt_filename, txt_filename):
+    def convert_rpt_to_txt(lines, txt_filename):
         """
-        Converts a .rpt file to a .txt file while maintaining row structure.
+        Writes the lines of a .rpt file to a .txt file while maintaining row structure.
         """
-        with open(rpt_filename, 'r') as rpt_file, open(txt_filename, 'w') as txt_file:
-            for line in rpt_file:
-                txt_file.write(line)
+        with open(txt_filename, 'w') as txt_file:
+            txt_file.writelines(lines)
 
-    def create_pdf(self):
+    def create_pdf(self, pdf_filename='./Data_Analysis_Suite_Output_Files/Blind_Receiver_highlighted.pdf', open_pdf=True, highlighted_pages_only=False):
         """
         Creates the highlighted PDF.
+
+        :param pdf_filename: Where to write the PDF.
+        :param open_pdf: Open the PDF in the browser once it is written.
+        :param highlighted_pages_only: Only render the pages that contain highlighted rows.
+        :return: The path of the PDF.
         """
-        self.highlight_rows_in_pdf(self.txt_file_name, './Data_Analysis_Suite_Output_Files/Blind_Receiver_highlighted.pdf')
-        print(f"Highlighted rows written to Blind_Receiver_highlighted.pdf saved in ./Data_Analysis_Suite_Output_Files")
-        # webbrowser.open_new('./Data_Analysis_Suite_Output_Files/Blind_Receiver_highlighted.pdf')
-        output_file = os.path.abspath('./Data_Analysis_Suite_Output_Files/Blind_Receiver_highlighted.pdf')
-        webbrowser.open_new(output_file)
+        self.highlight_rows_in_pdf(pdf_filename, highlighted_pages_only)
+        print(f"Highlighted rows written to {os.path.basename(pdf_filename)} saved in {os.path.dirname(pdf_filename)}")
+        if open_pdf:
+            output_file = os.path.abspath(pdf_filename)
+            webbrowser.open_new(output_file)
+        return pdf_filename
+
+    def get_findings(self):
+        """
+        Lists every highlighted row found by the analysis, in file order.
+
+        :return: A list of dicts with the line number, priority level and row text.
+        """
+        return [
+            {'Line Number': i + 1, 'Priority': self.highlighted_rows[i], 'Row': self.lines[i].strip()}
+            for i in sorted(self.highlighted_rows)
+        ]
 
     def isInaccessibleLocation(self,line):
         return self.TIME_PATTERN.search(line) and (self.START_PATTERN.search(line) or self.EXCLAMATION_PATTERN.search(line)) and self.LOCATION_ID_PATTERN.search(line)
@@ -353,15 +442,79 @@ class BFHighlighter:
         """
         Updates the array storing inaccessible locations
         """
-        with open(self.txt_file_name, 'r') as txt_file:
-            lines = txt_file.readlines()
-            for i, line in enumerate(lines):
-                if self.isInaccessibleLocation(line):
-                    self.crossed_rows.append(line)
-
-    def rpt_to_txt(self, rpt_file):
-        self.convert_rpt_to_txt(rpt_file, self.txt_file_name)
-        self.updatedCrossedOutRows()
+        for i, line in enumerate(self.lines):
+            if self.isInaccessibleLocation(line):
+                self.crossed_rows.add(i)
+
+    def rpt_to_txt(self):
+        self.convert_rpt_to_txt(self.lines, self.txt_file_name)
+
+def highlight_trip(rpt_file_path, output_dir, trip_name=None):
+    """
+    Analyzes one trip and writes its highlighted PDF, used as the worker of run_batch.
+
+    :param rpt_file_path: The trip .rpt file.
+    :param output_dir: The directory the PDF is written to.
+    :param trip_name: Name of the trip in the PDF file name and the findings, the .rpt file name by default.
+    :return: A tuple of (trip name, list of findings).
+    """
+    if trip_name is None:
+        trip_name = os.path.splitext(os.path.basename(rpt_file_path))[0]
+    BFH = BFHighlighter(rpt_file_path)
+    BFH.create_pdf(os.path.join(output_dir, f"{trip_name}_highlighted.pdf"), open_pdf=False)
+    return trip_name, BFH.get_findings()
+
+def run_batch(rpt_paths, output_dir='./Data_Analysis_Suite_Output_Files', max_workers=None):
+    """
+    Highlights many trips across a process pool, writing one PDF per trip and a
+    Blind_Receiver_batch_summary.csv of every RED/ORANGE/YELLOW finding.
+
+    :param rpt_paths: A folder containing .rpt files, or a list of .rpt file paths.
+    :param output_dir: The directory the PDFs and summary are written to.
+    :param max_workers: Number of worker processes, defaults to the number of CPU cores.
+    :return: The path of the summary CSV.
+    """
+    if isinstance(rpt_paths, str):
+        rpt_paths = sorted(
+            os.path.join(rpt_paths, name) for name in os.listdir(rpt_paths) if name.lower().endswith('.rpt')
+        )
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    trip_findings = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(highlight_trip, path, output_dir): path for path in rpt_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                trip_name, findings = future.result()
+            except Exception as e:
+                print(f"Error processing {path}: {e}")
+                continue
+            trip_findings.append((trip_name, findings))
+            print(f"{trip_name}: " + ", ".join(
+                f"{sum(1 for finding in findings if finding['Priority'] == level)} {level}" for level in ('RED', 'ORANGE', 'YELLOW')
+            ))
+    return write_batch_summary(trip_findings, output_dir)
+
+def write_batch_summary(trip_findings, output_dir):
+    """
+    Writes Blind_Receiver_batch_summary.csv of every finding of a batch of trips.
+
+    :param trip_findings: List of (trip name, list of findings) tuples, as returned by highlight_trip.
+    :param output_dir: The directory the summary is written to.
+    :return: The path of the summary CSV.
+    """
+    summary_rows = [{'Trip': trip_name, **finding} for trip_name, findings in trip_findings for finding in findings]
+    # Order the summary by trip, then by position in the trip
+    summary_rows.sort(key=lambda row: (row['Trip'], row['Line Number']))
+    summary_file = os.path.join(output_dir, 'Blind_Receiver_batch_summary.csv')
+    with open(summary_file, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=['Trip', 'Line Number', 'Priority', 'Row'])
+        writer.writeheader()
+        writer.writerows(summary_rows)
+    print(f"Summary of {len(trip_findings)} trips written to {os.path.basename(summary_file)} saved in {output_dir}")
+    return summary_file
 
 # if __name__ == "__main__":
 #     obj=BFHighlighter('BF2.rpt')
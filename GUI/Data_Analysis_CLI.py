@@ -0,0 +1,250 @@
+"""
+Runs the Data Analysis Suite tools without the GUI, for scheduled jobs and servers. Nothing is shown on screen or opened
+in a browser, several inputs are processed at once and a JSON summary of the run is printed and saved.
+
+Examples:
+    python Data_Analysis_CLI.py blind-receiver "trips/*.rpt" -o reports/blind_receiver
+    python Data_Analysis_CLI.py faults exports/Vehicle_Alarm_Summary_2024-07-01.csv -o reports/faults
+    python Data_Analysis_CLI.py recirculation "location_events/*.rpt" -o reports/recirculation --format parquet
+    python Data_Analysis_CLI.py pallet-history "pallet_history/*.txt" --location "AGVO_*" -o reports/pallet_history
+
+Every input of the faults, recirculation and pallet-history tools gets a folder of its own in the output directory
+named after the input file, since their output file names are fixed. Blind-receiver PDFs are named after their trip
+instead, numbered the same way when trips from different folders share a name. The faults HTML reports share one
+plotly.js bundle in the output directory.
+"""
+import argparse
+import glob
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+import matplotlib
+# Plots are only saved, never shown
+matplotlib.use("Agg")
+
+TOOL_EXTENSIONS = {
+    "blind-receiver": ".rpt",
+    "faults": ".csv",
+    "recirculation": ".rpt",
+    "pallet-history": ".txt",
+}
+
+def expand_inputs(patterns, extension):
+    """
+    Expands file names, glob patterns and folders (every file with the tool's extension in them) into a sorted list of
+    absolute paths. Patterns are expanded here as well since the Windows shell does not.
+    """
+    input_paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in os.listdir(pattern) if name.lower().endswith(extension)]
+        else:
+            matches = glob.glob(pattern)
+        if not matches:
+            print(f"No input files match {pattern}", file=sys.stderr)
+        input_paths.extend(os.path.abspath(path) for path in matches)
+    return sorted(dict.fromkeys(input_paths))
+
+def job_folders(input_paths, output_dir):
+    """
+    Returns the output folder of every input, named after the input file and numbered when two inputs share a name.
+    Blind-receiver uses the folder names as trip names and writes its PDFs straight into the output directory.
+    """
+    folders = []
+    used = set()
+    for input_path in input_paths:
+        name = os.path.splitext(os.path.basename(input_path))[0]
+        folder_name = name
+        number = 2
+        while folder_name in used:
+            folder_name = f"{name}_{number}"
+            number += 1
+        used.add(folder_name)
+        folders.append(os.path.join(output_dir, folder_name))
+    return folders
+
+def run_job(tool, input_path, job_dir, options):
+    """
+    Runs one tool on one input, used as the worker of run_tool.
+
+    :return: Dictionary with the input, status ("ok" or "failed"), error, seconds, the output files relative to the
+             output directory, what the tool printed and for blind-receiver its findings.
+    """
+    start = time.perf_counter()
+    start_time = time.time()
+    output_dir = os.path.dirname(job_dir)
+    output = io.StringIO()
+    job = {"input": input_path, "status": "ok", "error": None}
+    previous_dir = os.getcwd()
+    try:
+        with redirect_stdout(output), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if tool == "blind-receiver":
+                # Trips write <trip>_highlighted.pdf straight into the output directory
+                from BlindReceiverHighlighter import highlight_trip
+                job["trip"], job["findings"] = highlight_trip(input_path, output_dir, os.path.basename(job_dir))
+            elif tool == "faults":
+                # The HTML reports of every input share one plotly.js bundle in the output directory
+                from FaultPlotter import FaultPlotter
+                os.makedirs(job_dir, exist_ok=True)
+                FaultPlotter(input_path).plot_faults(open_html=False, standalone_html=options["standalone_html"],
+                                                     output_dir=job_dir, bundle_dir=output_dir)
+            else:
+                # The other tools write to ./Data_Analysis_Suite_Output_Files, run them from the input's own folder
+                os.makedirs(os.path.join(job_dir, "Data_Analysis_Suite_Output_Files"), exist_ok=True)
+                os.chdir(job_dir)
+                run_tool_in_output_folder(tool, input_path, options)
+    except Exception:
+        job["status"] = "failed"
+        job["error"] = traceback.format_exc().strip().splitlines()[-1]
+    finally:
+        os.chdir(previous_dir)
+        if "matplotlib.pyplot" in sys.modules:
+            # Workers are reused, do not let the figures of earlier jobs pile up
+            sys.modules["matplotlib.pyplot"].close("all")
+
+    if tool == "blind-receiver":
+        # Other trips write to the same directory at the same time, so only look for this trip's PDF
+        pdf_name = f"{os.path.basename(job_dir)}_highlighted.pdf"
+        job["outputs"] = [pdf_name] if job["status"] == "ok" and os.path.exists(os.path.join(output_dir, pdf_name)) else []
+    else:
+        tool_output_dir = os.path.join(job_dir, "Data_Analysis_Suite_Output_Files")
+        if os.path.isdir(tool_output_dir):
+            for name in os.listdir(tool_output_dir):
+                shutil.move(os.path.join(tool_output_dir, name), os.path.join(job_dir, name))
+            os.rmdir(tool_output_dir)
+        # Files left from an earlier run into the same directory are not this job's outputs
+        output_names = sorted(name for name in os.listdir(job_dir) if os.path.getmtime(os.path.join(job_dir, name)) >= start_time - 1) if os.path.isdir(job_dir) else []
+        job["outputs"] = [os.path.join(os.path.basename(job_dir), name) for name in output_names]
+    job["messages"] = output.getvalue().splitlines()
+    if tool != "blind-receiver":
+        # The tools name the files where they wrote them, point at where they are now, relative to the output directory
+        job_folder = os.path.basename(job_dir)
+        job["messages"] = [message.replace("./Data_Analysis_Suite_Output_Files", job_folder).replace(job_dir, job_folder)
+                           for message in job["messages"]]
+    # The tools report most errors by printing them, a job that wrote nothing failed
+    if job["status"] == "ok" and not job["outputs"]:
+        job["status"] = "failed"
+        job["error"] = job["messages"][-1] if job["messages"] else "No output files were written"
+    job["seconds"] = round(time.perf_counter() - start, 3)
+    return job
+
+def run_tool_in_output_folder(tool, input_path, options):
+    if tool == "recirculation":
+        from RecirculationProcessor import RecirculationProcessor
+        RCProcessor = RecirculationProcessor(input_path)
+        RCProcessor.load_events()
+        RCProcessor.write_sorted_csv(options["format"], options["top_k"], open_csv=False, show=False)
+    elif tool == "pallet-history":
+        from MixIdentifier import MixIdentifier
+        location = options["location"]
+        if any(character in location for character in "*?["):
+            with open(input_path, "r") as text_file:
+                identifiers = MixIdentifier.for_all_locations(location, text_file.read(), options.get("max_diagram_rows", MixIdentifier.MAX_DIAGRAM_ROWS))
+            if not identifiers:
+                print(f"No moves found for locations matching {location}")
+            for identifier in identifiers:
+                identifier.create_outputs(show=False)
+        else:
+            MixIdentifier.from_file(location, input_path, options.get("max_diagram_rows", MixIdentifier.MAX_DIAGRAM_ROWS)).update_values(show=False)
+
+def run_tool(tool, patterns, output_dir, max_workers=None, **options):
+    """
+    Runs a tool on every input in a process pool.
+
+    :param tool: "blind-receiver", "faults", "recirculation" or "pallet-history".
+    :param patterns: Input files, glob patterns or folders.
+    :param output_dir: The directory the outputs are written to.
+    :param max_workers: Number of worker processes, defaults to the number of CPU cores.
+    :param options: Tool options, format and top_k for recirculation, location for pallet-history, standalone_html for faults.
+    :return: The run summary.
+    """
+    started = datetime.now()
+    start = time.perf_counter()
+    output_dir = os.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    input_paths = expand_inputs(patterns, TOOL_EXTENSIONS[tool])
+    folders = job_folders(input_paths, output_dir)
+
+    jobs = []
+    if input_paths:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            jobs = list(executor.map(run_job, [tool] * len(input_paths), input_paths, folders, [options] * len(input_paths)))
+
+    summary_files = []
+    if tool == "blind-receiver" and jobs:
+        from BlindReceiverHighlighter import write_batch_summary
+        trip_findings = [(job["trip"], job["findings"]) for job in jobs if "findings" in job]
+        with redirect_stdout(io.StringIO()):
+            summary_files.append(os.path.basename(write_batch_summary(trip_findings, output_dir)))
+        # Only the number of findings of each level goes in the JSON, the rows are in the summary CSV
+        for job in jobs:
+            if "findings" in job:
+                job["findings"] = {level: sum(1 for finding in job["findings"] if finding["Priority"] == level) for level in ("RED", "ORANGE", "YELLOW")}
+    elif tool == "faults":
+        summary_files.extend(sorted(os.path.basename(path) for path in glob.glob(os.path.join(output_dir, "plotly-*.min.js"))))
+
+    return {
+        "tool": tool,
+        "started": started.isoformat(timespec="seconds"),
+        "output_dir": output_dir,
+        "options": options,
+        "inputs": len(input_paths),
+        "succeeded": sum(1 for job in jobs if job["status"] == "ok"),
+        "failed": sum(1 for job in jobs if job["status"] != "ok"),
+        "seconds": round(time.perf_counter() - start, 3),
+        "summary_files": summary_files,
+        "jobs": jobs,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs the Data Analysis Suite tools without the GUI.")
+    subparsers = parser.add_subparsers(dest="tool", required=True)
+
+    def add_tool(name, help_text):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("inputs", nargs="+", help=f"{TOOL_EXTENSIONS[name]} files, glob patterns or folders")
+        subparser.add_argument("-o", "--output-dir", default="./Data_Analysis_Suite_Output_Files", help="where the outputs are written")
+        subparser.add_argument("-j", "--jobs", type=int, default=None, help="inputs processed at once, defaults to the number of CPU cores")
+        subparser.add_argument("--summary", default=None, help="where the JSON run summary is saved, defaults to run_summary.json in the output directory")
+        return subparser
+
+    add_tool("blind-receiver", "highlight Blind Receiver reports and summarize the findings of all trips")
+    faults = add_tool("faults", "plot ATOM Vehicle Alarm Summary exports")
+    faults.add_argument("--standalone-html", action="store_true", help="embed plotly.js in every HTML file")
+    recirculation = add_tool("recirculation", "sort and plot the recirculations in Location Event exports")
+    recirculation.add_argument("--format", choices=["csv", "parquet", "feather"], default="csv", help="format of the sorted circulation data")
+    recirculation.add_argument("--top-k", type=int, default=None, help="only write the most recirculated pallets")
+    pallet_history = add_tool("pallet-history", "find mixed pallets in Pallet History text dumps")
+    pallet_history.add_argument("--location", required=True, help="the location, or a pattern such as AGVO_* for every matching location")
+    pallet_history.add_argument("--max-diagram-rows", type=int, default=500, help="largest number of moves drawn in the diagram, 0 to always draw it")
+
+    args = parser.parse_args(argv)
+    options = {}
+    if args.tool == "faults":
+        options["standalone_html"] = args.standalone_html
+    elif args.tool == "recirculation":
+        options.update(format=args.format, top_k=args.top_k)
+    elif args.tool == "pallet-history":
+        options.update(location=args.location, max_diagram_rows=args.max_diagram_rows or None)
+
+    summary = run_tool(args.tool, args.inputs, args.output_dir, args.jobs, **options)
+    summary_text = json.dumps(summary, indent=2)
+    summary_file = args.summary or os.path.join(summary["output_dir"], "run_summary.json")
+    with open(summary_file, "w") as file:
+        file.write(summary_text)
+    print(summary_text)
+    return 0 if summary["inputs"] and summary["failed"] == 0 else 1
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,18 +1,23 @@
 import tkinter as tk
 from tkinter import filedialog, simpledialog, scrolledtext
-from FaultPlotter import FaultPlotter
-from BlindReceiverHighlighter import BFHighlighter
-from RecirculationProcessor import RecirculationProcessor
-from MixIdentifier import MixIdentifier
+from ProcessorRegistry import processors
+from JobExecutor import JobExecutor
+from LogSink import LogSink
 import sys
-from PIL import Image, ImageTk
+import time
+import multiprocessing
+import webbrowser
 import os
 import warnings
 
 # Suppress the specific FutureWarning from pandas globally
 warnings.simplefilter(action='ignore', category=FutureWarning)
 class GUI:
-    def __init__(self):
+    def __init__(self, warm_up=True):
+        """
+        :param warm_up: Import the processors in the background once the window shows, and start a worker process that
+                        imports them for the next process job, instead of importing them on the first click.
+        """
         # Create the output directory to store subsequent files
         output_dir = "./Data_Analysis_Suite_Output_Files"
         if not os.path.exists(output_dir):
@@ -25,7 +30,7 @@ class GUI:
         # base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
         # image_path = os.path.join(base_path,  'logo.png')
         
-        # # Load and resize the image
+        # # Load and resize the image (from PIL import Image, ImageTk)
         # self.original_image = Image.open(image_path)
         # self.resized_image = self.original_image.resize((150, 100), Image.LANCZOS)
         # self.logo = ImageTk.PhotoImage(self.resized_image)
@@ -34,26 +39,105 @@ class GUI:
         # logo_label = tk.Label(self.root, image=self.logo)
         # logo_label.pack(side=tk.TOP, anchor=tk.NW, padx=10, pady=10)
         
+        # Analyses run in the background so the window keeps responding, several at once if needed
+        self.jobs = JobExecutor(self.root, on_change=self.refresh_jobs)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
         self.create_buttons_with_info()
+        self.create_job_list()
 
         self.text_area = scrolledtext.ScrolledText(self.root, wrap=tk.WORD, width=100, height=30)
         self.text_area.pack(pady=20)
 
-        sys.stdout = TextRedirector(self.text_area, "stdout")
-        sys.stderr = TextRedirector(self.text_area, "stderr")
+        # Output of every thread is batched into the text area and mirrored to Data_Analysis_Suite.log
+        self.log_sink = LogSink(self.text_area)
+        sys.stdout = self.log_sink
+        sys.stderr = self.log_sink
+
+        if warm_up:
+            self.root.after(500, self.warm_up)
+        if os.environ.get("DATA_ANALYSIS_SUITE_STARTUP_BENCHMARK"):
+            # StartupBenchmark measures until the window has been drawn, or until the first result, then it closes
+            self.root.after_idle(self.report_startup)
 
         self.root.mainloop()
 
+    def warm_up(self):
+        processors.warm_up()
+        self.jobs.warm_up(processors.module_names())
+
+    def report_startup(self):
+        self.root.update()
+        window_time = time.time()
+        input_path = os.environ.get("DATA_ANALYSIS_SUITE_BENCHMARK_INPUT")
+        if input_path is None:
+            self.write_startup_report(window_time)
+            return
+        # Identify the mixes in a pallet history a few seconds after the window shows, like a user clicking the button
+        click_delay = float(os.environ.get("DATA_ANALYSIS_SUITE_BENCHMARK_CLICK_DELAY", "3"))
+        self.root.after(int(click_delay * 1000), self.click_for_benchmark, window_time, input_path)
+
+    def click_for_benchmark(self, window_time, input_path):
+        job = self.jobs.submit("Startup benchmark", identify_mixes, "AGVO_01", None, input_path, in_process=True)
+        self.wait_for_benchmark(job, window_time, time.time())
+
+    def wait_for_benchmark(self, job, window_time, click_time):
+        if job.status in ("queued", "running"):
+            self.root.after(20, self.wait_for_benchmark, job, window_time, click_time)
+        else:
+            self.write_startup_report(window_time, time.time() - click_time if job.status == "done" else None)
+
+    def write_startup_report(self, window_time, result_seconds=None):
+        # The windowed build has no stdout, so the times are written to the file the benchmark named: when the window
+        # showed, and how long the first result took after the click
+        with open(os.environ["DATA_ANALYSIS_SUITE_STARTUP_BENCHMARK"], "w") as report_file:
+            report_file.write(f"{window_time}\n{'' if result_seconds is None else result_seconds}\n")
+        self.close()
+
+    def create_job_list(self):
+        frame = tk.Frame(self.root)
+        frame.pack(pady=5)
+        tk.Label(frame, text="Running and finished analyses:").pack(anchor=tk.W)
+        self.job_list = tk.Listbox(frame, width=100, height=5)
+        self.job_list.pack(side=tk.LEFT)
+        cancel_button = tk.Button(frame, text="Cancel Selected", command=self.cancel_selected_job)
+        cancel_button.pack(side=tk.LEFT, padx=5)
+
+    def refresh_jobs(self, job):
+        # Newest job first
+        self.job_list.delete(0, tk.END)
+        for listed_job in reversed(self.jobs.jobs):
+            self.job_list.insert(tk.END, str(listed_job))
+
+    def cancel_selected_job(self):
+        for index in self.job_list.curselection():
+            self.jobs.cancel(self.jobs.jobs[len(self.jobs.jobs) - 1 - index])
+
+    def open_output(self, file_path):
+        if file_path:
+            webbrowser.open_new(os.path.abspath(file_path))
+
+    def close(self):
+        self.jobs.shutdown()
+        sys.stdout = sys.__stdout__
+        sys.stderr = sys.__stderr__
+        self.log_sink.close()
+        self.root.destroy()
+
     def create_buttons_with_info(self):
         # Create buttons with info
         self.create_button_with_info("Highlight Blind Receiver (.rpt)", self.browse_rpt, 
-                                     "How to Gather Dataset From ICS:\n 1. Reports -> Trip Operations -> Blind Receiver/Cover Sheet\n 2. Enter Trip #\n 3. Check 'Pallet Details'\n 4. Click checkmark at the top left of screen to export data")
+                                     "How to Gather Dataset From ICS:\n 1. Reports -> Trip Operations -> Blind Receiver/Cover Sheet\n 2. Enter Trip #\n 3. Check 'Pallet Details'\n 4. Click checkmark at the top left of screen to export data\n\nSelect several .rpt files at once to highlight every trip and write a summary of all findings")
         self.create_button_with_info("Plot Fault Data (.csv)", self.browse_csv, 
                                      "How to Gather Fault Data From ATOM:\n 1. Click Stats on the left tab\n 2. Select Vehicle Alarms\n 3. Select Vehicle Alarm Summary\n 4. Ensure group is 'Vehicle Alarm Type'\n 5. Select Date Range\n 6. Click execute\n 7. Click 'export' to export data")
+        self.create_button_with_info("Find Fault Trends (folder of .csv)", self.browse_fault_folder,
+                                     "Select a folder of daily ATOM Vehicle Alarm Summary exports (gathered as for 'Plot Fault Data', one file per day with the date in the file name, e.g. Vehicle_Alarm_Summary_2024-07-01.csv).\n\nRanks the vehicles whose faults grew the most over the last 7 days and draws a heatmap of unusual fault days. Exports already loaded before are read from a cache.")
         self.create_button_with_info("Process Recirculation Data (.rpt)", self.run_recirculation_processor, 
-                                     "How to Gather Dataset from ICS:\n 1. Reports -> Warehouse Operations -> Location Event\n 2. For most accurate results, under 'Available Locations' select Fork_21 to Fork_25 ONLY\n 3. Click Green right arrow\n 4. Check 'all groups' and click green search button\n 5. Check 'all events' at the bottom of the screen\n 6. Click checkmark at the top left of screen to export data" )
+                                     "How to Gather Dataset from ICS:\n 1. Reports -> Warehouse Operations -> Location Event\n 2. For most accurate results, under 'Available Locations' select Fork_21 to Fork_25 ONLY\n 3. Click Green right arrow\n 4. Check 'all groups' and click green search button\n 5. Check 'all events' at the bottom of the screen\n 6. Click checkmark at the top left of screen to export data\n\nEvery processed export is also added to the recirculation history" )
+        self.create_button_with_info("Process Recirculation History", self.show_recirculation_history_input,
+                                     "Regenerates the recirculation CSV and plot for a date range from every Location Event export processed so far. Events repeated in overlapping exports are only counted once.")
         self.create_button_with_info("Process Pallet History Data (copy-and-paste))", self.show_mix_identifier_input,
-                                     "How to Gather Pallet History Data from ICS:\n 1. Misc -> Pallet History\n 2. Input Desired Location and Timeframe\n 3. Copy all the Pallet History Info\n 4. Click 'Process Pallet History Data' button in Data Analysis Suite GUI\n 5. Paste coped info into large text box and enter Location into small text box") 
+                                     "How to Gather Pallet History Data from ICS:\n 1. Misc -> Pallet History\n 2. Input Desired Location and Timeframe\n 3. Copy all the Pallet History Info\n 4. Click 'Process Pallet History Data' button in Data Analysis Suite GUI\n 5. Paste coped info into large text box and enter Location into small text box (a pattern such as AGVO_* processes every matching Location)\n\nFor large histories, enter the Location and use 'Run Mix Identifier on Clipboard' right after copying, or save the info to a .txt file and use 'Run Mix Identifier on File'") 
     
     def create_button_with_info(self, button_text, command, info_text):
         frame = tk.Frame(self.root)
@@ -79,10 +163,14 @@ class GUI:
         # close_button.pack(pady=10)
 
     def browse_rpt(self):
-        file_path = filedialog.askopenfilename(filetypes=[("RPT files", "*.rpt")])
-        if file_path:
-            BFH = BFHighlighter(file_path)
-            BFH.create_pdf()
+        file_paths = filedialog.askopenfilenames(filetypes=[("RPT files", "*.rpt")])
+        if len(file_paths) == 1:
+            self.jobs.submit(f"Blind Receiver {os.path.basename(file_paths[0])}", highlight_blind_receiver, file_paths[0],
+                             in_process=True, group="blind-receiver", on_done=self.open_output)
+        elif len(file_paths) > 1:
+            # Several trips selected, highlight them all in parallel
+            self.jobs.submit(f"Blind Receiver batch of {len(file_paths)} trips", highlight_blind_receivers, list(file_paths),
+                             in_process=True, group="blind-receiver", on_done=self.open_output)
 
     def browse_csv(self):
         """
@@ -90,15 +178,53 @@ class GUI:
         """
         file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
         if file_path:
-            fault_plotter = FaultPlotter(file_path)
-            fault_plotter.plot_faults()
+            self.jobs.submit(f"Fault Data {os.path.basename(file_path)}", plot_fault_data, file_path,
+                             in_process=True, group="faults", on_done=self.open_output)
             # fault_plotter.plot_faults_html()
 
+    def browse_fault_folder(self):
+        """
+        Opens a folder dialog to select daily fault exports and reports the vehicles trending worse.
+        """
+        folder = filedialog.askdirectory()
+        if folder:
+            self.jobs.submit(f"Fault Trends {os.path.basename(folder)}", find_fault_trends, folder,
+                             in_process=True, group="fault-trends", on_done=self.open_output)
+
     def run_recirculation_processor(self):
         file_path = filedialog.askopenfilename(filetypes=[("RPT files", "*.rpt")])
         if file_path:
-            RCProcessor = RecirculationProcessor(file_path)
-            RCProcessor.create_sorted_csv()
+            self.jobs.submit(f"Recirculation {os.path.basename(file_path)}", process_recirculation_data, file_path,
+                             in_process=True, group="recirculation", on_done=self.open_recirculation_plot)
+
+    def open_recirculation_plot(self, output_file):
+        if output_file:
+            self.open_output('./Data_Analysis_Suite_Output_Files/recirculation_data_plot.png')
+            self.open_output('./Data_Analysis_Suite_Output_Files/recirculation_rate_plot.png')
+
+    def show_recirculation_history_input(self):
+        # Create a new window for the date range
+        self.history_window = tk.Toplevel(self.root)
+        self.history_window.title("Recirculation History")
+
+        self.start_date_label = tk.Label(self.history_window, text="Start date (YYYY-MM-DD), leave empty for the earliest event:")
+        self.start_date_label.pack(pady=5)
+        self.start_date_entry = tk.Entry(self.history_window, width=30)
+        self.start_date_entry.pack(pady=5)
+
+        self.end_date_label = tk.Label(self.history_window, text="End date (YYYY-MM-DD), leave empty for the latest event:")
+        self.end_date_label.pack(pady=5)
+        self.end_date_entry = tk.Entry(self.history_window, width=30)
+        self.end_date_entry.pack(pady=5)
+
+        self.history_button = tk.Button(self.history_window, text="Process Recirculation History", command=self.run_recirculation_history)
+        self.history_button.pack(pady=10)
+
+    def run_recirculation_history(self):
+        start_date = self.start_date_entry.get().strip() or None
+        end_date = self.end_date_entry.get().strip() or None
+        self.jobs.submit(f"Recirculation History {start_date or 'start'} to {end_date or 'end'}", process_recirculation_history,
+                         start_date, end_date, in_process=True, group="recirculation", on_done=self.open_recirculation_plot)
             
     def show_mix_identifier_input(self):
         # Create a new window for input
@@ -106,7 +232,7 @@ class GUI:
         self.input_window.title("Input Pallet History Data")
 
         # Create location entry
-        self.location_label = tk.Label(self.input_window, text="Enter location here (e.g., AGVO_01):")
+        self.location_label = tk.Label(self.input_window, text="Enter location here (e.g., AGVO_01, or AGVO_* for every AGVO station):")
         self.location_label.pack(pady=5)
         self.location_entry = tk.Entry(self.input_window, width=50)
         self.location_entry.pack(pady=5)
@@ -119,17 +245,60 @@ class GUI:
         self.input_text_area = scrolledtext.ScrolledText(self.input_window, wrap=tk.WORD, width=100, height=10)
         self.input_text_area.pack(pady=10)
 
+        # Histories with more moves than this only get the CSV files, a diagram of thousands of moves takes long to draw
+        self.diagram_rows_label = tk.Label(self.input_window, text="Largest number of moves to draw in the diagram (leave empty to always draw it):")
+        self.diagram_rows_label.pack(pady=5)
+        self.diagram_rows_entry = tk.Entry(self.input_window, width=10)
+        self.diagram_rows_entry.insert(0, str(processors.get("MixIdentifier").MAX_DIAGRAM_ROWS))
+        self.diagram_rows_entry.pack(pady=5)
+
         # Create button to run MixIdentifier
         self.process_button = tk.Button(self.input_window, text="Run Mix Identifier", command=self.run_mix_identifier)
         self.process_button.pack(pady=10)
 
+        # Large histories are slow to paste into the text area, read them straight from the clipboard or a saved file instead
+        self.clipboard_button = tk.Button(self.input_window, text="Run Mix Identifier on Clipboard", command=self.run_mix_identifier_clipboard)
+        self.clipboard_button.pack(pady=5)
+        self.file_button = tk.Button(self.input_window, text="Run Mix Identifier on File (.txt)", command=self.run_mix_identifier_file)
+        self.file_button.pack(pady=5)
+
     def run_mix_identifier(self):
         location_input = self.location_entry.get()
         input_text = self.input_text_area.get("1.0", tk.END)
-        mix_identifier = MixIdentifier(location_input, input_text)
-        mix_identifier.update_values()
+        self.process_pallet_history(location_input, input_text)
         # mix_identifier.plot_data()
         # mix_identifier.create_csv()
+
+    def run_mix_identifier_clipboard(self):
+        location_input = self.location_entry.get()
+        try:
+            input_text = self.root.clipboard_get()
+        except tk.TclError:
+            print("The clipboard is empty, copy the Pallet History Info first")
+            return
+        self.process_pallet_history(location_input, input_text)
+
+    def run_mix_identifier_file(self):
+        location_input = self.location_entry.get()
+        file_path = filedialog.askopenfilename(filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+        if file_path:
+            # The job reads the file itself, large dumps are neither read on the Tk thread nor copied to the worker
+            self.process_pallet_history(location_input, None, file_path)
+
+    def process_pallet_history(self, location_input, input_text, text_file_path=None):
+        diagram_rows_text = self.diagram_rows_entry.get().strip()
+        if diagram_rows_text and not diagram_rows_text.isdigit():
+            print("The largest number of moves to draw must be a whole number, or empty to always draw the diagram")
+            return
+        max_diagram_rows = int(diagram_rows_text) if diagram_rows_text else None
+        # A location with wildcards (e.g. AGVO_*) creates the outputs of every matching location from one parse
+        if any(character in location_input for character in "*?["):
+            # Creates the outputs in a process pool of its own, cancelling the job stops the pool too
+            self.jobs.submit(f"Pallet History {location_input}", identify_mixes_all_locations, location_input, input_text, text_file_path,
+                             max_diagram_rows, in_process=True, group="pallet-history")
+        else:
+            self.jobs.submit(f"Pallet History {location_input}", identify_mixes, location_input, input_text, text_file_path,
+                             max_diagram_rows, in_process=True, group="pallet-history", on_done=self.open_output)
         
     def close_all_windows_and_execute(self, command):
         # Close all child windows
@@ -139,17 +308,67 @@ class GUI:
         # Execute the command
         command()
     
-class TextRedirector(object):
-    def __init__(self, widget, tag="stdout"):
-        self.widget = widget
-        self.tag = tag
+# Analyses run by the job executor, module level so process jobs can pickle them.
+# Processors are looked up in the registry inside the job, so their imports never hold up the window.
+# Every tool writes to fixed file names in ./Data_Analysis_Suite_Output_Files, so jobs of the same tool are submitted
+# in one group and run one after the other, while different tools run at the same time. Jobs return the file to
+# open, the GUI opens it once the job is done.
+
+def highlight_blind_receiver(file_path):
+    return processors.get("BFHighlighter")(file_path).create_pdf(open_pdf=False)
+
+def highlight_blind_receivers(file_paths):
+    return processors.get("run_batch")(file_paths)
+
+def plot_fault_data(file_path):
+    return processors.get("FaultPlotter")(file_path).plot_faults(open_html=False)
+
+def find_fault_trends(folder):
+    fault_history = processors.get("FaultHistory")(folder)
+    history = fault_history.load()
+    return processors.get("FaultAnomalyDetector")(history, export_dates=fault_history.export_dates).create_report(open_html=False)
+
+def process_recirculation_data(file_path):
+    # Keep every export in the history store so date ranges spanning several exports can be processed later.
+    # An export that was added before keeps the year it was given then.
+    history = processors.get("RecirculationHistory")()
+    RCProcessor = processors.get("RecirculationProcessor")(file_path, history.reference_date(file_path))
+    RCProcessor.load_events()
+    history.ingest(file_path, RCProcessor)
+    history.close()
+    return RCProcessor.write_sorted_csv(show=False)
+
+def process_recirculation_history(start_date, end_date):
+    history = processors.get("RecirculationHistory")()
+    try:
+        return history.create_sorted_csv(start_date, end_date, show=False)
+    except ValueError:
+        print("Dates must be entered as YYYY-MM-DD")
+    finally:
+        history.close()
 
-    def write(self, str):
-        self.widget.insert(tk.END, str)
-        self.widget.see(tk.END)
+def identify_mixes(location_input, input_text, text_file_path=None, max_diagram_rows=500):
+    """
+    :param text_file_path: Read the history from this file instead of input_text.
+    :param max_diagram_rows: Largest number of moves drawn in the diagram, None to always draw it.
+    :return: The path of the diagram for the GUI to open, None if it was not drawn.
+    """
+    MixIdentifier = processors.get("MixIdentifier")
+    if text_file_path is not None:
+        mix_identifier = MixIdentifier.from_file(location_input, text_file_path, max_diagram_rows)
+    else:
+        mix_identifier = MixIdentifier(location_input, input_text, max_diagram_rows=max_diagram_rows)
+    mix_identifier.update_values(show=False)
+    if mix_identifier.time_range and mix_identifier.draws_diagram():
+        return f'./Data_Analysis_Suite_Output_Files/{mix_identifier.output_name}_Diagram.png'
+    return None
 
-    def flush(self):
-        pass
+def identify_mixes_all_locations(location_pattern, input_text, text_file_path=None, max_diagram_rows=500):
+    if text_file_path is not None:
+        with open(text_file_path, 'r') as text_file:
+            input_text = text_file.read()
+    processors.get("process_all_locations")(location_pattern, input_text, max_diagram_rows=max_diagram_rows)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # needed by the batch process pool in the PyInstaller build
     GUI()
@@ -6,7 +6,8 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=['plotly'],
+    hiddenimports=['plotly', 'BlindReceiverHighlighter', 'FaultPlotter', 'FaultHistory', 'FaultAnomalyDetector',
+                   'RecirculationProcessor', 'RecirculationHistory', 'MixIdentifier'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
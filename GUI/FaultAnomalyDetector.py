@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+import webbrowser
+import plotly.graph_objects as go
+from FaultPlotter import write_html
+import os
+
+class FaultAnomalyDetector:
+    """
+    Finds vehicles whose faults are trending worse in a FaultHistory frame. Every (vehicle, fault type) pair becomes a
+    row of daily counts in one array, so the rolling means, z-scores and week-over-week deltas of the whole fleet are
+    computed with a few cumulative sums instead of a loop per vehicle.
+    """
+    def __init__(self, history, window_days=7, export_dates=None):
+        """
+        :param history: DataFrame from FaultHistory.load with 'Date', 'Vehicle Number', 'Fault Type' and 'Fault Count' columns.
+        :param window_days: Length of the rolling window, also the "week" of the week-over-week deltas.
+        :param export_dates: The dates that have an export, FaultHistory.export_dates. Days without one (weekends,
+                             holidays) are left out of the rolling means and z-scores instead of counting as fault free.
+                             By default every day from the first to the last date of the history has one.
+        """
+        self.window_days = window_days
+        self.build_daily_counts(history, export_dates)
+        self.compute_statistics()
+
+    def build_daily_counts(self, history, export_dates=None):
+        """
+        Builds self.daily_counts, a (pair, day) array of fault counts with zeros on days without faults. Pairs are
+        sorted by vehicle, self.pair_vehicles and self.pair_fault_types give the vehicle and fault type of each row.
+        self.exported tells which days have an export.
+        """
+        days = history['Date'].to_numpy().astype('datetime64[D]')
+        export_days = np.asarray(export_dates if export_dates is not None else [], dtype='datetime64[D]')
+        all_days = np.concatenate([days, export_days])
+        self.first_day = all_days.min() if len(all_days) else np.datetime64('today', 'D')
+        num_days = int((all_days.max() - self.first_day).astype(int)) + 1 if len(all_days) else 0
+        self.dates = self.first_day + np.arange(num_days)
+        if export_dates is None:
+            self.exported = np.ones(num_days, dtype=bool)
+        else:
+            self.exported = np.isin(self.dates, all_days)
+
+        vehicle_codes, self.vehicles = pd.factorize(history['Vehicle Number'], sort=True)
+        fault_codes, self.fault_types = pd.factorize(history['Fault Type'], sort=True)
+        pair_keys = vehicle_codes.astype(np.int64) * len(self.fault_types) + fault_codes
+        unique_pairs, pair_codes = np.unique(pair_keys, return_inverse=True)
+        self.pair_vehicles = unique_pairs // max(len(self.fault_types), 1)
+        self.pair_fault_types = unique_pairs % max(len(self.fault_types), 1)
+
+        self.daily_counts = np.zeros((len(unique_pairs), num_days), dtype=np.float64)
+        np.add.at(self.daily_counts, (pair_codes, (days - self.first_day).astype(int)), history['Fault Count'].to_numpy())
+        # Rows of each vehicle are contiguous, for summing the pairs of a vehicle with reduceat
+        self.vehicle_starts = np.flatnonzero(np.r_[True, self.pair_vehicles[1:] != self.pair_vehicles[:-1]]) if len(unique_pairs) else np.array([], dtype=np.int64)
+
+    def compute_statistics(self):
+        """
+        Computes for every pair and day:
+        - rolling_means: mean count over the exported days of the window ending that day
+        - z_scores: how far that day's count is above the exported days of the window before it, in standard deviations
+          (at least one fault), NaN on days without an export
+        - weekly_deltas: faults in the window ending that day minus faults in the window before it
+        """
+        window = self.window_days
+        counts = self.daily_counts
+        num_pairs, num_days = counts.shape
+        padded = np.zeros((num_pairs, num_days + 1))
+        np.cumsum(counts, axis=1, out=padded[:, 1:])
+        squares = np.zeros((num_pairs, num_days + 1))
+        np.cumsum(counts ** 2, axis=1, out=squares[:, 1:])
+        # Days without an export have no counts, the means are over the number of exported days in each window
+        exported_days = np.zeros(num_days + 1)
+        np.cumsum(self.exported, out=exported_days[1:])
+
+        # Sum of the window ending on each day, shorter at the start of the history
+        ends = np.arange(1, num_days + 1)
+        starts = np.maximum(ends - window, 0)
+        lengths = exported_days[ends] - exported_days[starts]
+        window_sums = padded[:, ends] - padded[:, starts]
+        self.rolling_means = window_sums / np.maximum(lengths, 1)
+
+        # Mean and standard deviation of the window before each day
+        previous_ends = ends - 1
+        previous_starts = np.maximum(previous_ends - window, 0)
+        previous_lengths = exported_days[previous_ends] - exported_days[previous_starts]
+        previous_means = (padded[:, previous_ends] - padded[:, previous_starts]) / np.maximum(previous_lengths, 1)
+        previous_squares = (squares[:, previous_ends] - squares[:, previous_starts]) / np.maximum(previous_lengths, 1)
+        previous_std = np.sqrt(np.maximum(previous_squares - previous_means ** 2, 0))
+        self.z_scores = (counts - previous_means) / np.maximum(previous_std, 1)
+        # Nothing to compare a day against without an export in the window before it, e.g. the first day
+        self.z_scores[:, previous_lengths == 0] = 0
+        self.z_scores[:, ~self.exported] = np.nan
+
+        week_before = np.zeros_like(window_sums)
+        if num_days > window:
+            week_before[:, window:] = window_sums[:, :-window]
+        self.weekly_deltas = window_sums - week_before
+        self.window_sums = window_sums
+
+    def vehicle_totals(self, values):
+        """
+        Sums a (pair, day) array over the fault types of each vehicle.
+        """
+        if len(self.vehicle_starts) == 0:
+            return np.zeros((0, values.shape[1]))
+        return np.add.reduceat(values, self.vehicle_starts, axis=0)
+
+    def vehicle_maximums(self, values):
+        """
+        Takes the maximum of a (pair, day) array over the fault types of each vehicle, ignoring NaN.
+        """
+        if len(self.vehicle_starts) == 0:
+            return np.zeros((0, values.shape[1]))
+        return np.fmax.reduceat(values, self.vehicle_starts, axis=0)
+
+    def rank_vehicles(self):
+        """
+        Ranks the vehicles by how much their faults grew in the last window compared to the window before.
+
+        :return: DataFrame with one row per vehicle, most worsening vehicle first.
+        """
+        last_day = len(self.dates) - 1
+        this_week = self.vehicle_totals(self.window_sums[:, last_day:])[:, 0]
+        # Sum of the fault types' rolling means, the vehicle's average faults per day over the last window
+        rolling_means = self.vehicle_totals(self.rolling_means[:, last_day:])[:, 0]
+        deltas = self.vehicle_totals(self.weekly_deltas[:, last_day:])[:, 0]
+        last_week = this_week - deltas
+        window_start = max(last_day - self.window_days + 1, 0)
+        max_z_scores = self.vehicle_maximums(np.nanmax(self.z_scores[:, window_start:], axis=1, keepdims=True))[:, 0]
+
+        # Fault type that grew the most for each vehicle, sorting by vehicle then decreasing change puts it first in each vehicle's rows
+        pair_deltas = self.weekly_deltas[:, last_day]
+        order = np.lexsort((-pair_deltas, self.pair_vehicles))
+        worst_pairs = order[self.vehicle_starts]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.where(last_week > 0, deltas / last_week * 100, np.nan)
+        ranking = pd.DataFrame({
+            'Vehicle Number': np.asarray(self.vehicles)[self.pair_vehicles[self.vehicle_starts]],
+            f'Faults Last {self.window_days} Days': this_week,
+            f'Faults Previous {self.window_days} Days': last_week,
+            f'Mean Faults per Day ({self.window_days} Day Rolling)': np.round(rolling_means, 2),
+            'Change': deltas,
+            'Change (%)': np.round(change, 1),
+            'Max Z-Score': np.round(max_z_scores, 2),
+            'Most Increased Fault Type': np.asarray(self.fault_types)[self.pair_fault_types[worst_pairs]],
+            'Most Increased Fault Change': pair_deltas[worst_pairs]
+        })
+        return ranking.sort_values(['Change', 'Max Z-Score'], ascending=False, kind='stable', ignore_index=True)
+
+    def create_report(self, open_html=True):
+        """
+        Writes the vehicle ranking to Fault_Trends.csv and a heatmap of each vehicle's highest daily fault z-score
+        to Fault_Anomaly_Heatmap.html, vehicles in ranking order.
+
+        :param open_html: Open the heatmap in the browser when done.
+        :return: The path of the heatmap, None if there was no history.
+        """
+        if len(self.dates) == 0:
+            print("No fault history to analyze")
+            return None
+        ranking = self.rank_vehicles()
+        output_csv = './Data_Analysis_Suite_Output_Files/Fault_Trends.csv'
+        ranking.to_csv(output_csv, index=False)
+        print(f"Vehicles ranked by fault trend have been successfully written to {output_csv}")
+
+        vehicle_z_scores = self.vehicle_maximums(self.z_scores)
+        vehicle_rows = pd.Index(np.asarray(self.vehicles)[self.pair_vehicles[self.vehicle_starts]]).get_indexer(ranking['Vehicle Number'])
+        fig = go.Figure(go.Heatmap(
+            z=vehicle_z_scores[vehicle_rows],
+            x=self.dates.astype(str),
+            y=ranking['Vehicle Number'].astype(str),
+            colorscale='Reds',
+            zmin=0,
+            colorbar=dict(title='Max Z-Score'),
+            hovertemplate='Vehicle %{y}<br>%{x}<br>Max z-score %{z:.2f}<extra></extra>'
+        ))
+        fig.update_layout(
+            title=f'Fault Anomalies by Vehicle ({self.window_days} day window), most worsening vehicles first',
+            xaxis_title='Date',
+            yaxis_title='Vehicle Number',
+            yaxis=dict(autorange='reversed', type='category'),
+            height=max(400, 15 * len(ranking) + 200)
+        )
+        output_html = './Data_Analysis_Suite_Output_Files/Fault_Anomaly_Heatmap.html'
+        write_html(fig, output_html)
+        print(f"Fault anomaly heatmap has been successfully written to {output_html}")
+        if open_html:
+            webbrowser.open_new(os.path.abspath(output_html))
+        return output_html
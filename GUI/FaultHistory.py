@@ -0,0 +1,101 @@
+import glob
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import pandas as pd
+from FaultPlotter import FaultPlotter
+
+class FaultHistory:
+    """
+    Loads a folder of daily ATOM Vehicle Alarm Summary exports into one long (vehicle, fault type, count, date) history.
+    Every parsed export is cached on disk keyed by its contents, so loading the folder again only parses new or changed exports.
+    """
+    def __init__(self, folder, cache_dir="./Data_Analysis_Suite_Output_Files/fault_history_cache"):
+        self.folder = folder
+        self.cache_dir = cache_dir
+        self.export_dates = []  # dates of the exports found by load, days without an export are unknown, not fault free
+        os.makedirs(cache_dir, exist_ok=True)
+        # Feather needs pyarrow, fall back to pickled frames without it
+        try:
+            import pyarrow
+            self.cache_format = "feather"
+        except ImportError:
+            self.cache_format = "pkl"
+
+    @staticmethod
+    def export_date(csv_file_path):
+        """
+        Returns the date of an export, from a YYYY-MM-DD or YYYYMMDD date in its file name or else its modification date.
+        """
+        match = re.search(r'(\d{4})-?(\d{2})-?(\d{2})', os.path.basename(csv_file_path))
+        if match:
+            try:
+                return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+            except ValueError:
+                pass
+        return date.fromtimestamp(os.path.getmtime(csv_file_path))
+
+    def cache_path(self, csv_file_path, export_date):
+        """
+        Returns where the parsed export is cached, named after the SHA-1 of its contents and its date.
+        """
+        digest = hashlib.sha1()
+        with open(csv_file_path, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(block)
+        return os.path.join(self.cache_dir, f"{digest.hexdigest()}_{export_date}.{self.cache_format}")
+
+    def load(self, max_workers=None):
+        """
+        Loads every .csv export in the folder, parsing the ones without a cached frame in a process pool.
+
+        :param max_workers: Number of worker processes, defaults to the number of CPU cores.
+        :return: DataFrame with 'Date', 'Vehicle Number', 'Fault Type' and 'Fault Count' columns sorted by date,
+                 vehicle and fault type. Vehicle/fault type pairs without faults on a day are left out. The dates that
+                 have an export are in self.export_dates.
+        """
+        csv_files = sorted(glob.glob(os.path.join(self.folder, "*.csv")))
+        cache_paths = []
+        to_parse = []
+        export_dates = set()
+        for csv_file_path in csv_files:
+            export_date = self.export_date(csv_file_path)
+            export_dates.add(export_date)
+            cache_path = self.cache_path(csv_file_path, export_date)
+            cache_paths.append(cache_path)
+            if not os.path.exists(cache_path):
+                to_parse.append((csv_file_path, export_date, cache_path))
+
+        if len(to_parse) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(parse_export, *zip(*to_parse)))
+        elif to_parse:
+            parse_export(*to_parse[0])
+        print(f"Loaded {len(csv_files)} fault exports from {self.folder}, {len(to_parse)} new or changed")
+        self.export_dates = sorted(export_dates)
+
+        frames = [pd.read_feather(path) if self.cache_format == "feather" else pd.read_pickle(path) for path in cache_paths]
+        if not frames:
+            return pd.DataFrame({'Date': pd.Series(dtype='datetime64[ns]'), 'Vehicle Number': pd.Series(dtype=int),
+                                 'Fault Type': pd.Series(dtype=str), 'Fault Count': pd.Series(dtype=float)})
+        history = pd.concat(frames, ignore_index=True)
+        return history.sort_values(['Date', 'Vehicle Number', 'Fault Type'], ignore_index=True)
+
+def parse_export(csv_file_path, export_date, cache_path):
+    """
+    Parses one export into its long form frame and writes it to the cache, used as the worker of FaultHistory.load.
+    """
+    fault_counts = FaultPlotter(csv_file_path).read_fault_counts()
+    frame = fault_counts.stack().rename('Fault Count').reset_index()
+    frame = frame[frame['Fault Count'] > 0].reset_index(drop=True)
+    frame.insert(0, 'Date', pd.Timestamp(export_date))
+    frame['Fault Type'] = frame['Fault Type'].astype(str)
+    # Write to a temporary name first so an interrupted run never leaves a partial cache file behind
+    temp_path = cache_path + ".tmp"
+    if cache_path.endswith(".feather"):
+        frame.to_feather(temp_path)
+    else:
+        frame.to_pickle(temp_path, compression=None)
+    os.replace(temp_path, cache_path)
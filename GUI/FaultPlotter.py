@@ -1,134 +1,167 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import webbrowser
-import matplotlib.cm as cm
+import plotly
 import plotly.express as px
 import plotly.graph_objects as go
-from matplotlib.colors import ListedColormap
+from plotly.offline import get_plotlyjs
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.patches import Patch
+from matplotlib.collections import PolyCollection
 import os
 
+# List of 60 distinct colors
+COLORS = [
+    "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf",
+    "#aec7e8", "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5", "#c49c94", "#f7b6d2", "#c7c7c7", "#dbdb8d", "#9edae5",
+    "#393b79", "#637939", "#8c6d31", "#843c39", "#7b4173", "#a55194", "#d6616b", "#e7ba52", "#7f2704", "#e7969c",
+    "#17becf", "#bcbd22", "#dbdb8d", "#6b6ecf", "#9c9ede", "#8ca252", "#b5cf6b", "#cedb9c", "#bd9e39", "#e7cb94",
+    "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf", "#aec7e8",
+    "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5", "#c49c94", "#f7b6d2", "#c7c7c7", "#dbdb8d", "#9edae5", "#393b79",
+    "#637939", "#8c6d31"
+]
+
+def write_html(fig, html_file_path, standalone=False, bundle_dir=None):
+    """
+    Writes a plotly figure to an HTML file. By default the HTML references a plotly.js bundle written once next to it
+    (named after the plotly version) instead of embedding the multi-megabyte bundle in every file. The bundle is a local
+    file, so the reports still open without internet, but the HTML has to stay where it is relative to the bundle.
+
+    :param fig: The plotly figure.
+    :param html_file_path: Where to write the HTML file.
+    :param standalone: Embed plotly.js in the HTML instead, for files that are moved or sent on their own.
+    :param bundle_dir: The folder the bundle is written to, the folder of the HTML file by default. Reports written to
+                       several folders can share one bundle in a parent folder, the HTML references it by relative path.
+    """
+    if standalone:
+        fig.write_html(html_file_path)
+        return
+    html_dir = os.path.dirname(os.path.abspath(html_file_path))
+    bundle_name = f"plotly-{plotly.__version__}.min.js"
+    bundle_path = os.path.join(os.path.abspath(bundle_dir) if bundle_dir else html_dir, bundle_name)
+    if not os.path.exists(bundle_path):
+        # Write to a temporary name of this process first, so a half written bundle is never picked up even when
+        # several processes write it at the same time
+        temp_path = f"{bundle_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as bundle_file:
+            bundle_file.write(get_plotlyjs())
+        os.replace(temp_path, bundle_path)
+    fig.write_html(html_file_path, include_plotlyjs=os.path.relpath(bundle_path, html_dir).replace(os.sep, "/"))
+
 class FaultPlotter:
     def __init__(self, csv_file_path):
         self.csv_file_path = csv_file_path
 
-    def plot_faults(self):
+    def read_fault_counts(self):
+        """
+        Reads the ATOM Vehicle Alarm Summary export into a table of fault counts.
+        The export has a title row, then a "Name" row with the vehicle numbers and a Total column, then one row per fault type.
+
+        :return: DataFrame of fault counts indexed by vehicle number (sorted), with one column per fault type (sorted by name).
+                 If a vehicle column has no number (e.g. "AGV 3" or blank), the vehicles are numbered by column position.
+        """
+        # Read the vehicle numbers first so every count column can be read straight as a number
+        header = pd.read_csv(self.csv_file_path, skiprows=1, nrows=0).columns
+        count_columns = list(header[1:-1])
+        data = pd.read_csv(self.csv_file_path, skiprows=1, index_col=0, usecols=[header[0]] + count_columns,
+                           dtype={column: np.float64 for column in count_columns})
+        fault_counts = data.T.fillna(0)
+        vehicle_numbers = pd.to_numeric(fault_counts.index, errors='coerce')
+        if vehicle_numbers.isna().any():
+            print(f"Not every vehicle column of {os.path.basename(self.csv_file_path)} has a vehicle number, numbering the vehicles by column")
+            vehicle_numbers = np.arange(1, len(fault_counts.index) + 1)
+        fault_counts.index = pd.Index(vehicle_numbers).astype(int)
+        fault_counts.index.name = 'Vehicle Number'
+        fault_counts.columns.name = 'Fault Type'
+        return fault_counts.sort_index().sort_index(axis=1)
+
+    def plot_faults(self, open_html=True, standalone_html=False, output_dir='./Data_Analysis_Suite_Output_Files', bundle_dir=None):
+        """
+        Plots the faults of every vehicle as stacked bars by fault type, to Fault_Data_Plot.jpg and the interactive
+        Fault_Data_interactive.html. Both are rendered off screen so the caller is not blocked.
+
+        :param open_html: Open the interactive plot in the browser when done.
+        :param standalone_html: Embed plotly.js in the HTML instead of sharing one copy in the output folder, see write_html.
+        :param output_dir: The directory the plots are written to.
+        :param bundle_dir: The folder of the shared plotly.js bundle, output_dir by default, see write_html.
+        :return: The path of the interactive HTML, None if the plot failed.
+        """
+        plot_file = f'{output_dir}/Fault_Data_Plot.jpg'
+        html_file = f'{output_dir}/Fault_Data_interactive.html'
         try:
-            # Read the CSV file, skipping the first row
-            data = pd.read_csv(self.csv_file_path, skiprows=1, header=None)
-
-            # Dynamically rename the columns based on the number of columns in the data
-            num_columns = data.shape[1]
-            column_names = ['Name'] + [str(i) for i in range(1, num_columns - 1)] + ['Total']
-            data.columns = column_names
-
-            # Calculate the total faults for each vehicle (sum across columns, excluding the first column and first row)
-            vehicle_totals = data.iloc[1:, 1:-1].sum(axis=0)
-
-            # Drop the 'Total' column before transposing
-            data = data.drop(columns=['Total'])
-
-            # Transposing the data to align it correctly
-            data = data.set_index('Name').transpose().reset_index()
-
-            # Renaming the index column
-            data.rename(columns={'index': 'Vehicle Number'}, inplace=True)
-
-            # Convert Vehicle Number to int for proper sorting
-            data['Vehicle Number'] = data['Vehicle Number'].astype(int)
-
-            # Melt the DataFrame to long format for easier plotting
-            melted_data = data.melt(id_vars=['Vehicle Number'], var_name='Fault Type', value_name='Fault Count')
-
-            # Convert Fault Count to numeric, forcing errors to NaN
-            melted_data['Fault Count'] = pd.to_numeric(melted_data['Fault Count'], errors='coerce')
-
-            # Replace NaN values with 0
-            melted_data['Fault Count'].fillna(0, inplace=True)
-
-            # Filter out the 'Name' from the Fault Type
-            melted_data = melted_data[melted_data['Fault Type'] != 'Name']
-
-            # Sort the melted data by Vehicle Number
-            melted_data = melted_data.sort_values(by='Vehicle Number')
-
-            # Plotting the stacked bar graph
-            plt.figure(figsize=(18, 10))  # Increase the figure size for a larger plot
-
-            # Create a pivot table for easier plotting, sorted by Vehicle Number
-            pivot_table = melted_data.pivot(index='Vehicle Number', columns='Fault Type', values='Fault Count').fillna(0)
-            pivot_table = pivot_table.sort_index()
-
-            # List of 60 distinct colors
-            colors = [
-                "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf",
-                "#aec7e8", "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5", "#c49c94", "#f7b6d2", "#c7c7c7", "#dbdb8d", "#9edae5",
-                "#393b79", "#637939", "#8c6d31", "#843c39", "#7b4173", "#a55194", "#d6616b", "#e7ba52", "#7f2704", "#e7969c",
-                "#17becf", "#bcbd22", "#dbdb8d", "#6b6ecf", "#9c9ede", "#8ca252", "#b5cf6b", "#cedb9c", "#bd9e39", "#e7cb94",
-                "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf", "#aec7e8",
-                "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5", "#c49c94", "#f7b6d2", "#c7c7c7", "#dbdb8d", "#9edae5", "#393b79",
-                "#637939", "#8c6d31"
-            ]
-
-            # Plot each fault type in a stacked manner
-            bottom = None
-            # colors = plt.cm.get_cmap('tab20', len(pivot_table.columns))
-
-            # Create the interactive plot
-            fig = go.Figure()
-            
-            for i, fault_type in enumerate(pivot_table.columns):
-                
-                bars = plt.bar(pivot_table.index.astype(str), pivot_table[fault_type], bottom=bottom, label=fault_type, color=colors[i])
-                if bottom is None:
-                    bottom = pivot_table[fault_type]
-                else:
-                    bottom += pivot_table[fault_type]
-                    
-                fig.add_trace(
-                    go.Bar(
-                        x=pivot_table.index.astype(str),
-                        y=pivot_table[fault_type],
-                        name=fault_type,
-                    )
-                )
+            fault_counts = self.read_fault_counts()
+            vehicles = fault_counts.index.astype(str)
+            counts = fault_counts.to_numpy()
+            vehicle_totals = counts.sum(axis=1)
+            # Bottom of every fault type's segment is the sum of the fault types stacked below it
+            bottoms = np.cumsum(counts, axis=1) - counts
+            colors = np.array([COLORS[i % len(COLORS)] for i in range(counts.shape[1])])
+
+            # Draw every non-empty segment as one collection of rectangles, a bar patch per segment is far slower to draw
+            fig = Figure(figsize=(18, 10))
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            vehicle_indices, fault_indices = np.nonzero(counts)
+            left = vehicle_indices - 0.4
+            right = vehicle_indices + 0.4
+            bottom = bottoms[vehicle_indices, fault_indices]
+            top = bottom + counts[vehicle_indices, fault_indices]
+            segments = np.stack([np.column_stack([left, bottom]), np.column_stack([left, top]),
+                                 np.column_stack([right, top]), np.column_stack([right, bottom])], axis=1)
+            ax.add_collection(PolyCollection(segments, facecolors=colors[fault_indices], linewidths=0))
+            ax.set_xticks(np.arange(len(vehicles)), vehicles, rotation=90)
+            # Keep the default 5% margins around every vehicle's bar, including vehicles without faults at either end
+            bars_width = len(vehicles) - 0.2
+            ax.set_xlim(-0.4 - 0.05 * bars_width, len(vehicles) - 0.6 + 0.05 * bars_width)
 
             # Calculate the maximum bar height for y-axis limit adjustment
-            max_height = vehicle_totals.max()
-            plt.ylim(0, max_height + 10)
+            max_height = vehicle_totals.max() if len(vehicle_totals) else 0
+            ax.set_ylim(0, max_height + 10)
 
             # Annotating the bars with the total number of faults for each vehicle
             for i, total in enumerate(vehicle_totals):
-                plt.text(i, total, f'{int(total)}', ha='center', va='bottom')
+                ax.text(i, total, f'{int(total)}', ha='center', va='bottom')
 
-            plt.xlabel('Vehicle Number')
-            plt.ylabel('Fault Count')
-            plt.title('Faults by Vehicle Number')
-            plt.xticks(rotation=90)
-            plt.grid(axis='y')
+            ax.set_xlabel('Vehicle Number')
+            ax.set_ylabel('Fault Count')
+            ax.set_title('Faults by Vehicle Number')
+            ax.grid(axis='y')
 
             # Adjust the legend to be below the plot and reduce font size
-            plt.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), title='Fault Types', ncol=4, fontsize='small')
+            handles = [Patch(color=color, label=fault_type) for fault_type, color in zip(fault_counts.columns, colors)]
+            ax.legend(handles=handles, loc='upper center', bbox_to_anchor=(0.5, -0.15), title='Fault Types', ncol=4, fontsize='small')
 
             # Adjust layout to make space for the legend
-            plt.tight_layout(rect=[0, 0, 1, 0.95])
-            plt.savefig("./Data_Analysis_Suite_Output_Files/Fault_Data_Plot.jpg")
-            # webbrowser.open_new('Fault_Data.jpg')
-            
-
-            # Add annotations for the total faults
-            for i, total in enumerate(vehicle_totals):
-                fig.add_annotation(
-                    x=str(i),  
-                    y=total,
-                    text=str(int(total)),
-                    showarrow=False,
-                    xref="x",
-                    yshift=10,
-                    font=dict(size=12, color='black')
+            fig.tight_layout(rect=[0, 0, 1, 0.95])
+            fig.savefig(plot_file)
+            print(f"Fault data has been successfully plotted to {plot_file}")
+
+            # Create the interactive plot from the long form counts, leaving out the empty segments
+            long_counts = pd.DataFrame({
+                'Vehicle Number': vehicles[vehicle_indices],
+                'Fault Type': fault_counts.columns[fault_indices],
+                'Fault Count': counts[vehicle_indices, fault_indices]
+            })
+            interactive_fig = px.bar(long_counts, x='Vehicle Number', y='Fault Count', color='Fault Type',
+                                     category_orders={'Vehicle Number': list(vehicles), 'Fault Type': list(fault_counts.columns)})
+
+            # Add the total faults above the bars as one text trace
+            interactive_fig.add_trace(
+                go.Scatter(
+                    x=vehicles,
+                    y=vehicle_totals,
+                    text=[str(int(total)) for total in vehicle_totals],
+                    mode='text',
+                    textposition='top center',
+                    textfont=dict(size=12, color='black'),
+                    showlegend=False,
+                    hoverinfo='skip'
                 )
+            )
 
             # Update the layout to include an interactive legend
-            fig.update_layout(
+            interactive_fig.update_layout(
                 barmode='stack',
                 xaxis_title='Vehicle Number',
                 yaxis_title='Fault Count',
@@ -136,20 +169,16 @@ class FaultPlotter:
                 legend_title='Fault Types',
                 hovermode='closest'
             )
-            
-            # Save the plot to an HTML file and open it in a browser
-            fig.write_html('./Data_Analysis_Suite_Output_Files/Fault_Data_interactive.html')
-            output_file = os.path.abspath('./Data_Analysis_Suite_Output_Files/Fault_Data_interactive.html')
-            webbrowser.open_new(output_file)
-            # webbrowser.open_new('./Data_Analysis_Suite_Output_Files/Fault_Data_interactive.html')
-            
 
-            plt.show()
+            # Save the plot to an HTML file and open it in a browser
+            write_html(interactive_fig, html_file, standalone_html, bundle_dir)
+            print(f"Interactive fault data has been successfully written to {html_file}")
+            if open_html:
+                webbrowser.open_new(os.path.abspath(html_file))
+            return html_file
         except pd.errors.EmptyDataError:
             print("Error: The CSV file is empty.")
         except pd.errors.ParserError:
             print("Error: The CSV file format is incorrect.")
         except Exception as e:
             print(f"An error occurred: {e}")
-            
-        
\ No newline at end of file
@@ -0,0 +1,89 @@
+import csv
+from datetime import timedelta
+
+class FifoAnalyzer:
+    """
+    Finds the pallets that left a location out of order. Every arrival at the location is paired with the pallet's next
+    departure into a visit, and a pallet that left while pallets that arrived before it were still waiting jumped the line.
+    The pallets each visit jumped are counted with a Fenwick tree in O(n log n) instead of comparing every pair of visits.
+    """
+    def __init__(self, mix_identifier):
+        """
+        :param mix_identifier: MixIdentifier whose moves have been read.
+        """
+        self.mix_identifier = mix_identifier
+        self.find_violations()
+
+    def find_violations(self):
+        """
+        Computes for every visit, in departure order:
+        - dwell_times: time between the arrival and the departure
+        - pallets_jumped: number of pallets that arrived before it and were still at the location when it left,
+          including pallets that had not left by the end of the history
+        Their sum, self.inversions, is the number of pairs of pallets that left in the opposite order they arrived in.
+        Arrivals of pallets that arrived again without a departure in between are left out of the counts, when they left
+        is not in the history. self.unpaired_arrivals is how many there are.
+        """
+        to_positions = [to_position for to_position, _ in self.mix_identifier.visits]
+        num_arrivals = len(self.mix_identifier.to_pallets)
+        # Fenwick tree over arrival positions of the visits that already left, 1-based
+        departed = [0] * (num_arrivals + 1)
+
+        def mark_departed(to_position):
+            index = to_position + 1
+            while index <= num_arrivals:
+                departed[index] += 1
+                index += index & -index
+
+        self.unpaired_arrivals = len(self.mix_identifier.unpaired_arrivals)
+        for to_position in self.mix_identifier.unpaired_arrivals:
+            mark_departed(to_position)
+        self.pallets_jumped = []
+        for to_position in to_positions:
+            # Arrivals before this one that already left
+            left_before = 0
+            index = to_position
+            while index > 0:
+                left_before += departed[index]
+                index -= index & -index
+            self.pallets_jumped.append(to_position - left_before)
+            mark_departed(to_position)
+        self.inversions = sum(self.pallets_jumped)
+        self.dwell_times = [self.mix_identifier.from_times[from_position] - self.mix_identifier.to_times[to_position]
+                            for to_position, from_position in self.mix_identifier.visits]
+
+    def violations(self):
+        """
+        :return: List of (pallet ID, arrival time, departure time, dwell time, pallets jumped) of every visit that left
+                 out of order, in departure order.
+        """
+        return [(self.mix_identifier.to_pallets[to_position], self.mix_identifier.to_times[to_position],
+                 self.mix_identifier.from_times[from_position], dwell_time, pallets_jumped)
+                for (to_position, from_position), dwell_time, pallets_jumped
+                in zip(self.mix_identifier.visits, self.dwell_times, self.pallets_jumped) if pallets_jumped > 0]
+
+    def create_csv(self):
+        """
+        Writes the pallets that left out of order to <output_name>_FIFO_Violations.csv, after a summary row.
+        """
+        violations = self.violations()
+        output_file = f'{self.mix_identifier.output_name}_FIFO_Violations.csv'
+        with open(f'./Data_Analysis_Suite_Output_Files/{output_file}', 'w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(['Pallet ID', 'Arrival Time', 'Departure Time', 'Dwell Time', 'Pallets Jumped'])
+            csv_writer.writerow([f'Time Range: {self.mix_identifier.time_range}', f'Visits: {len(self.dwell_times)}',
+                                 f'Out of Order: {len(violations)}', f'Average Dwell Time: {self.average_dwell_time()}',
+                                 f'FIFO Inversions: {self.inversions}', f'Unpaired Arrivals: {self.unpaired_arrivals}'])
+            for pallet_id, arrival_time, departure_time, dwell_time, pallets_jumped in violations:
+                csv_writer.writerow([pallet_id, arrival_time.strftime('%b %d %H:%M:%S'), departure_time.strftime('%b %d %H:%M:%S'),
+                                     str(dwell_time), pallets_jumped])
+
+        print(f"{len(violations)} of {len(self.dwell_times)} pallets left {self.mix_identifier.location_input} out of order, see '{output_file}'")
+
+    def average_dwell_time(self):
+        """
+        :return: The mean dwell time rounded to the second, None without visits.
+        """
+        if not self.dwell_times:
+            return None
+        return timedelta(seconds=round(sum(dwell_time.total_seconds() for dwell_time in self.dwell_times) / len(self.dwell_times)))
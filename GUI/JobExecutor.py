@@ -0,0 +1,344 @@
+import importlib
+import multiprocessing
+import os
+import queue
+import signal
+import subprocess
+import traceback
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout, redirect_stderr
+
+class Job:
+    """
+    One analysis submitted to a JobExecutor. status is "queued", "running", "done", "failed" or "cancelled".
+    """
+    def __init__(self, job_id, name, function, args, in_process, group, on_done):
+        self.job_id = job_id
+        self.name = name
+        self.function = function
+        self.args = args
+        self.in_process = in_process
+        self.group = group
+        self.on_done = on_done
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.future = None  # thread jobs
+        self.process = None  # process jobs
+        self.connection = None
+
+    def __str__(self):
+        return f"#{self.job_id} {self.name}: {self.status}"
+
+class JobExecutor:
+    """
+    Runs analyses off the Tk main thread so the window keeps responding. Light jobs that mostly wait on files go to a
+    thread pool, CPU heavy parsing and rendering and jobs that start a process pool of their own run in worker processes.
+    Everything that touches Tk (printing, result callbacks, job status) is handed back to the main thread through root.after.
+
+    Process jobs get a worker process of their own, at most max_processes at a time, so a running job can be stopped
+    on cancel, which a ProcessPoolExecutor cannot do. Cancelling stops the worker together with every process it started.
+    A running thread job cannot be stopped, its result is dropped instead.
+    After warm_up a spare worker that already imported the processors waits for the next process job.
+
+    Jobs of the same group run one at a time in the order they were submitted, for tools that write to fixed output
+    files or share a database.
+    """
+    POLL_MILLISECONDS = 50
+    MAX_MESSAGES_PER_POLL = 200  # per job, so a job that prints a lot cannot hold up the window
+
+    def __init__(self, root, max_threads=4, max_processes=None, on_change=None):
+        """
+        :param root: The Tk root window.
+        :param max_threads: Number of thread jobs running at once.
+        :param max_processes: Number of process jobs running at once, defaults to the number of CPU cores.
+        :param on_change: Called with the job on the main thread whenever a job is submitted or changes status.
+        """
+        self.root = root
+        self.thread_pool = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="job")
+        self.max_processes = max_processes or os.cpu_count() or 1
+        self.on_change = on_change
+        # Spawned workers do not inherit the Tk state of the GUI process, and it is what the Windows build does anyway
+        self.context = multiprocessing.get_context("spawn")
+        self.callbacks = queue.Queue()  # (function, args) to run on the main thread
+        self.jobs = []
+        self.waiting_jobs = deque()
+        self.running_process_jobs = []
+        self.busy_groups = set()  # groups with a job started and not finished
+        self.warm_modules = None  # modules a spare worker imports, set by warm_up
+        self.spare_worker = None  # (process, connection) of a worker waiting for a job
+        self.closed = False
+        self.root.after(self.POLL_MILLISECONDS, self.poll)
+
+    def post(self, function, *args):
+        """
+        Runs function(*args) on the Tk main thread soon, safe to call from any thread.
+        """
+        self.callbacks.put((function, args))
+
+    def submit(self, name, function, *args, in_process=False, group=None, on_done=None):
+        """
+        Starts a job. Whatever it prints shows up in the GUI as it runs.
+
+        :param name: Shown in the list of jobs.
+        :param function: The analysis to run. Process jobs need a module level function and picklable arguments.
+        :param args: Arguments for the function.
+        :param in_process: Run the job in a worker process instead of the thread pool.
+        :param group: Wait for the earlier jobs of this group to finish before starting.
+        :param on_done: Called on the main thread with the function's return value if the job succeeds.
+        :return: The Job.
+        """
+        job = Job(len(self.jobs) + 1, name, function, args, in_process, group, on_done)
+        self.jobs.append(job)
+        self.waiting_jobs.append(job)
+        self.changed(job)
+        self.start_jobs()
+        return job
+
+    def run_thread_job(self, job):
+        self.post(self.set_status, job, "running")
+        try:
+            result = job.function(*job.args)
+        except Exception:
+            self.post(self.finish, job, "failed", None, traceback.format_exc())
+        else:
+            self.post(self.finish, job, "done", result, None)
+
+    def warm_up(self, module_names):
+        """
+        Starts a spare worker process that imports the modules and then waits, so the next process job does not wait for
+        a new process to import them. Once a job has taken the spare worker and no process jobs are left running, another
+        one is started for the job after, so its imports do not slow down the running jobs.
+
+        :param module_names: The modules the jobs use.
+        """
+        self.warm_modules = list(module_names)
+        self.start_spare_worker()
+
+    def start_worker(self):
+        connection, child_connection = self.context.Pipe()
+        process = self.context.Process(target=run_worker, args=(child_connection, self.warm_modules or []), name="job-worker")
+        process.start()
+        child_connection.close()
+        return process, connection
+
+    def start_spare_worker(self):
+        if self.warm_modules is not None and self.spare_worker is None and not self.running_process_jobs and not self.closed:
+            self.spare_worker = self.start_worker()
+
+    def start_jobs(self):
+        """
+        Starts the waiting jobs whose group is free, process jobs only while a worker process is free.
+        """
+        blocked_groups = set(self.busy_groups)
+        for job in list(self.waiting_jobs):
+            if job.group is not None and job.group in blocked_groups:
+                continue
+            if job.in_process and len(self.running_process_jobs) >= self.max_processes:
+                # Later jobs of its group have to wait for it
+                blocked_groups.add(job.group)
+                continue
+            self.waiting_jobs.remove(job)
+            if job.group is not None:
+                self.busy_groups.add(job.group)
+                blocked_groups.add(job.group)
+            if job.in_process:
+                self.start_process_job(job)
+            else:
+                job.future = self.thread_pool.submit(self.run_thread_job, job)
+        self.start_spare_worker()
+
+    def start_process_job(self, job):
+        if self.spare_worker is not None and self.spare_worker[0].is_alive():
+            job.process, job.connection = self.spare_worker
+        else:
+            job.process, job.connection = self.start_worker()
+        self.spare_worker = None
+        self.running_process_jobs.append(job)
+        job.connection.send((job.function, job.args))
+        self.set_status(job, "running")
+
+    def poll(self):
+        """
+        Runs the posted callbacks and collects the output and results of process jobs, then schedules itself again.
+        A callback or job that raises is reported and skipped, it never stops the polling of the other jobs.
+        """
+        try:
+            while True:
+                try:
+                    function, args = self.callbacks.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    function(*args)
+                except Exception:
+                    print(f"Error while updating a job: {traceback.format_exc()}")
+
+            for job in list(self.running_process_jobs):
+                try:
+                    self.collect(job)
+                except Exception:
+                    if job in self.running_process_jobs:
+                        self.finish(job, "failed", None, traceback.format_exc())
+                    else:
+                        print(f"Error after {job.name} finished: {traceback.format_exc()}")
+            try:
+                self.start_jobs()
+            except Exception:
+                print(f"Error while starting a job: {traceback.format_exc()}")
+        finally:
+            if not self.closed:
+                self.root.after(self.POLL_MILLISECONDS, self.poll)
+
+    def collect(self, job):
+        """
+        Prints the output a process job sent so far, up to MAX_MESSAGES_PER_POLL messages, and finishes it once it sent
+        its result or its process died.
+        """
+        try:
+            for _ in range(self.MAX_MESSAGES_PER_POLL):
+                if not job.connection.poll():
+                    break
+                kind, value = job.connection.recv()
+                if kind == "output":
+                    print(value, end="")
+                else:
+                    self.finish(job, kind, value if kind == "done" else None, value if kind == "failed" else None)
+                    return
+        except (EOFError, OSError):
+            self.finish(job, "failed", None, "The worker process stopped unexpectedly")
+            return
+        # A dead worker may still have messages in the pipe, they are read on the next polls first
+        if not job.process.is_alive() and not job.connection.poll():
+            self.finish(job, "failed", None, "The worker process stopped unexpectedly")
+
+    def set_status(self, job, status):
+        if job.status == "cancelled":
+            return
+        job.status = status
+        self.changed(job)
+
+    def finish(self, job, status, result, error):
+        self.busy_groups.discard(job.group)
+        if job in self.running_process_jobs:
+            self.running_process_jobs.remove(job)
+            job.process.join()
+            job.connection.close()
+        if job.status == "cancelled":
+            return
+        job.status = status
+        job.result = result
+        job.error = error
+        self.changed(job)
+        if status == "failed":
+            print(f"{job.name} failed: {error}")
+        elif job.on_done is not None:
+            job.on_done(result)
+
+    def cancel(self, job):
+        """
+        Cancels a job. A waiting job never starts, a running process job is stopped and a running thread job
+        finishes in the background with its result ignored.
+        """
+        if job.status not in ("queued", "running"):
+            return
+        if job in self.waiting_jobs:
+            self.waiting_jobs.remove(job)
+            print(f"Cancelled {job.name}")
+        elif job.in_process:
+            kill_process_tree(job.process)
+            self.running_process_jobs.remove(job)
+            job.connection.close()
+            self.busy_groups.discard(job.group)
+            print(f"Cancelled {job.name}")
+        elif job.future.cancel():
+            self.busy_groups.discard(job.group)
+            print(f"Cancelled {job.name}")
+        else:
+            print(f"Cancelled {job.name}, it will finish in the background without its results being opened")
+        job.status = "cancelled"
+        self.changed(job)
+
+    def changed(self, job):
+        if self.on_change is not None:
+            self.on_change(job)
+
+    def shutdown(self):
+        """
+        Stops every process job and stops polling, for when the window closes. Running thread jobs are left to finish.
+        """
+        self.closed = True
+        processes = [job.process for job in self.running_process_jobs]
+        if self.spare_worker is not None:
+            processes.append(self.spare_worker[0])
+            self.spare_worker = None
+        for process in processes:
+            kill_process_tree(process)
+        self.running_process_jobs.clear()
+        self.waiting_jobs.clear()
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+
+def kill_process_tree(process):
+    """
+    Stops a worker process and the processes it started, such as the process pool of a batch job, which would otherwise
+    keep running on their own.
+    """
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True,
+                       creationflags=subprocess.CREATE_NO_WINDOW)
+    else:
+        # Workers lead a process group of their own, see run_worker
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass  # it stopped, or has not created its group yet and so has not started anything either
+    process.terminate()
+    process.join()
+
+class ConnectionWriter:
+    """
+    File-like object that sends what is written to the GUI process, used as stdout and stderr of process jobs.
+    """
+    def __init__(self, connection):
+        self.connection = connection
+
+    def write(self, text):
+        if text:
+            self.connection.send(("output", text))
+        return len(text)
+
+    def flush(self):
+        pass
+
+def run_worker(connection, module_names):
+    """
+    Runs in a worker process. Imports the modules, waits for the job sent through the connection, runs it and sends its
+    output and result back.
+    """
+    if hasattr(os, "setpgrp"):
+        # Processes started by the job join this group, so cancelling can stop all of them at once
+        os.setpgrp()
+    # Plots are saved to files, a worker process has no window to show them in
+    import matplotlib
+    matplotlib.use("Agg")
+    warnings.filterwarnings("ignore", message=".*non-interactive.*")
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            pass  # the job reports the error when it imports the module itself
+    try:
+        function, args = connection.recv()
+    except EOFError:
+        return  # the GUI closed before sending a job
+    writer = ConnectionWriter(connection)
+    with redirect_stdout(writer), redirect_stderr(writer):
+        try:
+            result = function(*args)
+        except Exception:
+            connection.send(("failed", traceback.format_exc()))
+        else:
+            connection.send(("done", result))
+    connection.close()
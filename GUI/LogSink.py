@@ -0,0 +1,85 @@
+import logging
+import os
+import queue
+import tkinter as tk
+from logging.handlers import RotatingFileHandler
+
+class LogSink:
+    """
+    Stands in for sys.stdout and sys.stderr in the GUI. Writes from any thread only go into a queue, the queued text is
+    inserted into the text widget in one batch every flush_milliseconds on the Tk main thread, so thousands of prints
+    cost one insert and one scroll. The widget keeps the last max_lines lines, and everything is also appended to a
+    rotating log file, so nothing is lost when the scrollback is trimmed.
+    """
+    def __init__(self, widget, log_file_path="./Data_Analysis_Suite_Output_Files/Data_Analysis_Suite.log",
+                 flush_milliseconds=50, max_lines=5000, max_log_bytes=5 * 1024 * 1024, backup_count=3):
+        """
+        :param widget: The Tk text widget the output is shown in.
+        :param log_file_path: The log file, rotated to .1, .2, ... when it reaches max_log_bytes.
+        :param flush_milliseconds: How often the queued text is shown.
+        :param max_lines: Number of lines the widget keeps.
+        :param max_log_bytes: Size of the log file before it is rotated.
+        :param backup_count: Number of rotated log files kept.
+        """
+        self.widget = widget
+        self.flush_milliseconds = flush_milliseconds
+        self.max_lines = max_lines
+        self.pending = queue.SimpleQueue()
+        self.closed = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(log_file_path)), exist_ok=True)
+        self.log_handler = RotatingFileHandler(log_file_path, maxBytes=max_log_bytes, backupCount=backup_count, encoding="utf-8")
+        # The batches already carry their own line breaks
+        self.log_handler.terminator = ""
+        self.log_handler.setFormatter(logging.Formatter("%(message)s"))
+
+        self.widget.after(self.flush_milliseconds, self.flush_to_widget)
+
+    def write(self, text):
+        if text:
+            self.pending.put(text)
+        return len(text)
+
+    def flush(self):
+        # Text is shown by flush_to_widget, print(flush=True) has nothing to wait for
+        pass
+
+    def take_pending(self):
+        """
+        :return: All text written since the last call, as one string.
+        """
+        parts = []
+        while True:
+            try:
+                parts.append(self.pending.get_nowait())
+            except queue.Empty:
+                return "".join(parts)
+
+    def flush_to_widget(self):
+        """
+        Shows the queued text and mirrors it to the log file, then schedules itself again.
+        """
+        text = self.take_pending()
+        if text:
+            self.widget.insert(tk.END, text)
+            # The widget always ends with a newline of its own, so end-1c is on the last line of text
+            num_lines = int(self.widget.index("end-1c").split(".")[0])
+            if num_lines > self.max_lines:
+                self.widget.delete("1.0", f"{num_lines - self.max_lines + 1}.0")
+            self.widget.see(tk.END)
+            self.write_log(text)
+        if not self.closed:
+            self.widget.after(self.flush_milliseconds, self.flush_to_widget)
+
+    def write_log(self, text):
+        self.log_handler.emit(logging.makeLogRecord({"msg": text}))
+
+    def close(self):
+        """
+        Writes whatever is still queued to the log file and closes it, for when the window closes.
+        """
+        self.closed = True
+        text = self.take_pending()
+        if text:
+            self.write_log(text)
+        self.log_handler.close()
@@ -1,12 +1,33 @@
 import re
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import csv
+import io
+import fnmatch
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from FifoAnalyzer import FifoAnalyzer
+
+@lru_cache(maxsize=None)
+def parse_day(day_text):
+    """
+    Parses the "Jul 13" part of an EVT1 timestamp, cached since a history only spans a few days.
+    """
+    return datetime.strptime(day_text, '%b %d')
 
 class MixIdentifier:
-    def __init__(self, loc_input, text_input):
+    # By default histories with more moves than this are only written to the CSV, the diagram is hard to read anyway
+    MAX_DIAGRAM_ROWS = 500
+
+    def __init__(self, loc_input, text_input, output_name="Pallet_History_Data", max_diagram_rows=MAX_DIAGRAM_ROWS):
         self.location_input = loc_input
         self.input_text = text_input# Define the input text (copied from ICS)
+        # Outputs are written to <output_name>.csv and <output_name>_Diagram.png
+        self.output_name = output_name
+        # Largest number of arrivals or departures drawn in the diagram, None to always draw it
+        self.max_diagram_rows = max_diagram_rows
 
         # Initialize lists to store extracted pallet IDs and timestamps
         self.to_pallets = []
@@ -16,72 +37,159 @@ class MixIdentifier:
         self.timestamps = []
         self.time_range = ""
         self.unique_pallets = None
+        self.visits = []  # (position in to_pallets, position in from_pallets) of every stay at the location
+        self.open_visits = {}  # pallet ID -> position in to_pallets of its arrival that has not left yet
+        self.unpaired_arrivals = []  # positions in to_pallets of arrivals whose departure is missing from the history
+
+        # Define the pattern to match EVT1 timestamp lines and EVT2 lines with 'To AGVO_01' or 'From AGVO_01',
+        # both in one so the whole history is scanned in a single regex pass instead of line by line
+        self.move_pattern = re.compile(r'^\s*(?:EVT1 (\w+ \d+) (\d+):(\d+):(\d+) I-OPRMOVMOV|EVT2 Opr .*? Moved Moveable (\w+) From (\w+) .*? To (\w+) .*? Shift:)', re.M)
+
+    @classmethod
+    def from_file(cls, loc_input, text_file_path, max_diagram_rows=MAX_DIAGRAM_ROWS):
+        """
+        Creates a MixIdentifier for a Pallet History dump saved to a text file, for histories too large to paste.
+        """
+        with open(text_file_path, 'r') as text_file:
+            return cls(loc_input, text_file.read(), max_diagram_rows=max_diagram_rows)
+
+    @classmethod
+    def for_all_locations(cls, location_pattern, text_input, max_diagram_rows=MAX_DIAGRAM_ROWS):
+        """
+        Parses the history once and splits the moves by location, for every location matching a pattern.
+
+        :param location_pattern: Shell style pattern of the locations, e.g. "AGVO_*".
+        :param text_input: The Pallet History text.
+        :param max_diagram_rows: Largest number of moves drawn in a location's diagram, None to always draw it.
+        :return: A MixIdentifier with its moves already read for each matching location, sorted by location.
+        """
+        parser = cls(location_pattern, text_input)
+        identifiers = {}  # location -> its MixIdentifier, or None if it does not match the pattern
 
-        # Define the pattern to match EVT2 lines with 'To AGVO_01' or 'From AGVO_01'
-        self.pattern = re.compile(r'EVT2 Opr .*? Moved Moveable (\w+) From (\w+) .*? To (\w+) .*? Shift:')
-        self.time_pattern = re.compile(r'EVT1 (\w+ \d+ \d+:\d+:\d+) I-OPRMOVMOV')
+        def identifier_for(location):
+            if location not in identifiers:
+                identifiers[location] = cls(location, None, f"Pallet_History_Data_{location}", max_diagram_rows) if fnmatch.fnmatchcase(location, location_pattern) else None
+            return identifiers[location]
 
-    def update_values(self):
+        current_time = None
+        for day_text, hours, minutes, seconds, pallet_id, from_location, to_location in (match.groups() for match in parser.move_pattern.finditer(text_input)):
+            if day_text is not None:
+                current_time = parse_day(day_text).replace(hour=int(hours), minute=int(minutes), second=int(seconds))
+                parser.timestamps.append(current_time)
+                continue
+            # Same rule as a single location, a move both to and from a location only counts as its arrival
+            to_identifier = identifier_for(to_location)
+            if to_identifier is not None:
+                to_identifier.add_arrival(pallet_id, current_time)
+            from_identifier = identifier_for(from_location) if from_location != to_location else None
+            if from_identifier is not None:
+                from_identifier.add_departure(pallet_id, current_time)
+
+        parser.find_time_range()
+        matching = [identifiers[location] for location in sorted(location for location in identifiers if identifiers[location] is not None)]
+        for identifier in matching:
+            identifier.time_range = parser.time_range
+        return matching
+
+    def update_values(self, show=True):
         try:
-            # Iterate through the lines and extract the pallet IDs and timestamps
-            current_time = None
-            for line in self.input_text.split('\n'):
-                time_match = self.time_pattern.match(line.strip())
-                if time_match:
-                    current_time = datetime.strptime(time_match.group(1), '%b %d %H:%M:%S')
-                    self.timestamps.append(current_time)
-                match = self.pattern.match(line.strip())
-                if match:
-                    pallet_id = match.group(1)
-                    from_location = match.group(2)
-                    to_location = match.group(3)
-                    if to_location == self.location_input:
-                        self.to_pallets.append(pallet_id)
-                        self.to_times.append(current_time)
-                    elif from_location == self.location_input:
-                        self.from_pallets.append(pallet_id)
-                        self.from_times.append(current_time)
-
-            # Find the earliest and latest timestamps
-            start_time = min(self.timestamps)
-            end_time = max(self.timestamps)
-            self.time_range = f"{start_time.strftime('%b %d %H:%M:%S')} - {end_time.strftime('%b %d %H:%M:%S')}"
-
-            # Find unique pallets and maintain order
-            self.unique_pallets = list(dict.fromkeys(self.to_pallets + self.from_pallets))
-            self.plot_data()
-            self.create_csv()
+            self.read_moves()
+            self.find_time_range()
+            self.create_outputs(show)
         except Exception as e:
             print(f"Pallet data not correctly formatted,  please check that you are only copying and pasting the correct info: {e}")
 
+    def find_time_range(self):
+        # Find the earliest and latest timestamps
+        start_time = min(self.timestamps)
+        end_time = max(self.timestamps)
+        self.time_range = f"{start_time.strftime('%b %d %H:%M:%S')} - {end_time.strftime('%b %d %H:%M:%S')}"
+
+    def draws_diagram(self):
+        """
+        :return: Whether the moves fit in the diagram, see max_diagram_rows.
+        """
+        return self.max_diagram_rows is None or max(len(self.to_pallets), len(self.from_pallets)) <= self.max_diagram_rows
+
+    def create_outputs(self, show=True):
+        """
+        Writes the diagram and CSV of the moves that were read, and the CSV of the pallets that left out of order.
+
+        :param show: Show the diagram in a window after saving it.
+        """
+        # Find unique pallets and maintain order
+        self.unique_pallets = list(dict.fromkeys(self.to_pallets + self.from_pallets))
+        if self.draws_diagram():
+            self.plot_data(show)
+        else:
+            print(f"More than {self.max_diagram_rows} moves at {self.location_input}, skipping the diagram, see the CSV file")
+        self.create_csv()
+        FifoAnalyzer(self).create_csv()
 
-    def plot_data(self):
+    def read_moves(self):
+        """
+        Extracts the pallet IDs and timestamps of the moves to and from the location in a single pass over the history.
+        Each move belongs to the I-OPRMOVMOV timestamp before it.
+        """
+        current_time = None
+        for day_text, hours, minutes, seconds, pallet_id, from_location, to_location in (match.groups() for match in self.move_pattern.finditer(self.input_text)):
+            if day_text is not None:
+                current_time = parse_day(day_text).replace(hour=int(hours), minute=int(minutes), second=int(seconds))
+                self.timestamps.append(current_time)
+            elif to_location == self.location_input:
+                self.add_arrival(pallet_id, current_time)
+            elif from_location == self.location_input:
+                self.add_departure(pallet_id, current_time)
+
+    def add_arrival(self, pallet_id, time):
+        # A pallet arriving again without having left, its earlier arrival never gets a departure
+        earlier_position = self.open_visits.get(pallet_id)
+        if earlier_position is not None:
+            self.unpaired_arrivals.append(earlier_position)
+        self.open_visits[pallet_id] = len(self.to_pallets)
+        self.to_pallets.append(pallet_id)
+        self.to_times.append(time)
+
+    def add_departure(self, pallet_id, time):
+        # A departure belongs to the pallet's latest arrival, pallets already there before the pasted history have none
+        to_position = self.open_visits.pop(pallet_id, None)
+        if to_position is not None:
+            self.visits.append((to_position, len(self.from_pallets)))
+        self.from_pallets.append(pallet_id)
+        self.from_times.append(time)
+
+    def plot_data(self, show=True):
         # Plot the results
         plt.figure(figsize=(12, 8))
+        ax = plt.gca()
 
-        # Draw text and lines
-        for i, pallet_id in enumerate(self.unique_pallets):
-            if pallet_id in self.to_pallets:
-                plt.text(-0.05, self.to_pallets.index(pallet_id) , "(" + pallet_id + ") " + str(self.to_times[self.to_pallets.index(pallet_id)]), va='center', ha='right', fontsize=12, color='blue')
-            if pallet_id in self.from_pallets:
-                plt.text(1.05, self.from_pallets.index(pallet_id), "(" + pallet_id + ") " + str(self.from_times[self.from_pallets.index(pallet_id)]), va='center', ha='left', fontsize=12, color='green')
-            if pallet_id in self.to_pallets and pallet_id in self.from_pallets:
-                plt.plot([0, 1], [self.to_pallets.index(pallet_id), self.from_pallets.index(pallet_id)], 'k-', lw=1)
-            plt.text(-0.5, -1.0, "To: " + self.location_input )
-            plt.text(1.2, -1.0, "From: " + self.location_input )
-
-        plt.gca().invert_yaxis()
+        # Draw text for every arrival and departure, including each visit of pallets that come back
+        for position, (pallet_id, time) in enumerate(zip(self.to_pallets, self.to_times)):
+            ax.text(-0.05, position, "(" + pallet_id + ") " + str(time), va='center', ha='right', fontsize=12, color='blue')
+        for position, (pallet_id, time) in enumerate(zip(self.from_pallets, self.from_times)):
+            ax.text(1.05, position, "(" + pallet_id + ") " + str(time), va='center', ha='left', fontsize=12, color='green')
+        # Connect every arrival to its departure in one collection
+        ax.add_collection(LineCollection([[(0, to_position), (1, from_position)] for to_position, from_position in self.visits], colors='k', linewidths=1))
+        ax.text(-0.5, -1.0, "To: " + self.location_input)
+        ax.text(1.2, -1.0, "From: " + self.location_input)
+
+        num_rows = max(len(self.to_pallets), len(self.from_pallets), 1)
+        ax.set_xlim(-0.05, 1.05)
+        ax.set_ylim(num_rows - 0.5, -0.5)
         plt.xticks([0, 1], [f'To {self.location_input}', f'From {self.location_input}'])
-        plt.title(f'Pallet IDs To and From AGVO_01\nTime Range: {self.time_range}')
+        plt.title(f'Pallet IDs To and From {self.location_input}\nTime Range: {self.time_range}')
         plt.axis('off')
 
         plt.tight_layout()
-        plt.savefig('./Data_Analysis_Suite_Output_Files/Pallet_History_Data_Diagram.png')
-        plt.show()
+        plt.savefig(f'./Data_Analysis_Suite_Output_Files/{self.output_name}_Diagram.png')
+        if show:
+            plt.show()
+        else:
+            plt.close()
 
     def create_csv(self):
         # Write the output to a CSV file
-        with open('./Data_Analysis_Suite_Output_Files/Pallet_History_Data.csv', 'w', newline='') as csvfile:
+        with open(f'./Data_Analysis_Suite_Output_Files/{self.output_name}.csv', 'w', newline='') as csvfile:
             csv_writer = csv.writer(csvfile)
             csv_writer.writerow(['To Pallet IDs', 'To Times', 'From Pallet IDs', 'From Times'])
             csv_writer.writerow([f'Time Range: {self.time_range}', '', '', ''])
@@ -93,7 +201,47 @@ class MixIdentifier:
                 from_time = self.from_times[i].strftime('%H:%M:%S') if i < len(self.from_times) else ''
                 csv_writer.writerow([to_pallet, to_time, from_pallet, from_time])
 
-        print(f"CSV file 'Pallet_History_Data.csv' and image 'Pallet_History_Data_Diagram.png' created successfully.")
+        print(f"CSV file '{self.output_name}.csv' and image '{self.output_name}_Diagram.png' created successfully.")
+
+def create_location_outputs(identifier):
+    """
+    Writes the outputs of one location without showing the diagram, used as the worker of process_all_locations.
+
+    :return: What was printed, for the parent process to print since the output of worker processes is not shown in the GUI.
+    """
+    plt.switch_backend('Agg')
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            identifier.create_outputs(show=False)
+        except Exception as e:
+            print(f"Could not create the outputs for {identifier.location_input}: {e}")
+    return output.getvalue()
+
+def process_all_locations(location_pattern, text_input, max_workers=None, max_diagram_rows=MixIdentifier.MAX_DIAGRAM_ROWS):
+    """
+    Parses the history once and writes Pallet_History_Data_<location>.csv and its diagram for every location
+    matching the pattern (e.g. "AGVO_*"), creating the outputs of different locations in parallel.
+
+    :param location_pattern: Shell style pattern of the locations.
+    :param text_input: The Pallet History text.
+    :param max_workers: Number of worker processes, defaults to the number of CPU cores.
+    :param max_diagram_rows: Largest number of moves drawn in a location's diagram, None to always draw it.
+    :return: The MixIdentifier of each matching location.
+    """
+    try:
+        identifiers = MixIdentifier.for_all_locations(location_pattern, text_input, max_diagram_rows)
+    except Exception as e:
+        print(f"Pallet data not correctly formatted,  please check that you are only copying and pasting the correct info: {e}")
+        return []
+    if not identifiers:
+        print(f"No moves found for locations matching {location_pattern}")
+        return []
+    print(f"Found {len(identifiers)} locations matching {location_pattern}: {', '.join(identifier.location_input for identifier in identifiers)}")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for output in executor.map(create_location_outputs, identifiers):
+            print(output, end="")
+    return identifiers
 
 if __name__ == "__main__":
   input_text = """
@@ -0,0 +1,61 @@
+import importlib
+import threading
+import time
+
+# Name of every tool the GUI uses -> (module, attribute). The modules pull in pandas, matplotlib, plotly and reportlab,
+# so they are only imported when a tool is first used. Keep Data_Analysis_Suite.spec's hiddenimports in sync, PyInstaller
+# cannot see imports made by name.
+PROCESSORS = {
+    "BFHighlighter": ("BlindReceiverHighlighter", "BFHighlighter"),
+    "run_batch": ("BlindReceiverHighlighter", "run_batch"),
+    "FaultPlotter": ("FaultPlotter", "FaultPlotter"),
+    "FaultHistory": ("FaultHistory", "FaultHistory"),
+    "FaultAnomalyDetector": ("FaultAnomalyDetector", "FaultAnomalyDetector"),
+    "RecirculationProcessor": ("RecirculationProcessor", "RecirculationProcessor"),
+    "RecirculationHistory": ("RecirculationHistory", "RecirculationHistory"),
+    "MixIdentifier": ("MixIdentifier", "MixIdentifier"),
+    "process_all_locations": ("MixIdentifier", "process_all_locations"),
+}
+
+class ProcessorRegistry:
+    """
+    Imports the processor modules on first use instead of when the GUI starts, so the window shows without waiting for
+    the heavy dependencies. warm_up imports them in the background once the window is up, so thread jobs do not wait for
+    them. Process jobs run in other processes, JobExecutor.warm_up prepares those.
+    """
+    def __init__(self, processors=PROCESSORS):
+        self.processors = processors
+        self.load_times = {}  # module -> seconds its first import took
+
+    def get(self, name):
+        """
+        Returns a processor class or function by name, importing its module if it has not been yet.
+        """
+        module_name, attribute = self.processors[name]
+        return getattr(self.load_module(module_name), attribute)
+
+    def load_module(self, module_name):
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        # Already imported modules come straight from sys.modules, only the first import is worth recording
+        self.load_times.setdefault(module_name, time.perf_counter() - start)
+        return module
+
+    def module_names(self):
+        return list(dict.fromkeys(module_name for module_name, _ in self.processors.values()))
+
+    def load_modules(self, module_names):
+        for module_name in module_names:
+            self.load_module(module_name)
+
+    def warm_up(self):
+        """
+        Imports every processor module in a background thread.
+
+        :return: The thread, already started.
+        """
+        thread = threading.Thread(target=self.load_modules, args=(self.module_names(),), name="processor-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+processors = ProcessorRegistry()
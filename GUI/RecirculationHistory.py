@@ -0,0 +1,172 @@
+import sqlite3
+import hashlib
+import os
+from datetime import datetime, date
+from RecirculationProcessor import RecirculationProcessor, CirculationEvents
+
+class RecirculationHistory:
+    """
+    Persistent SQLite store of "Pallet Moved To" events. Each Location Event export is ingested once, events
+    already stored by an overlapping export are skipped, and circulation_data_sorted.csv and the recirculation
+    plot can be regenerated for any date range without re-parsing old exports.
+
+    An export that starts in the middle of a location's rows has no location for its first events, so events are
+    matched on pallet, time and operator only, and a stored event without a location takes the location of the same
+    event in another export.
+    """
+    SCHEMA_VERSION = 1
+    EVENTS_TABLE = """
+        CREATE TABLE IF NOT EXISTS events (
+            pallet_id TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            location TEXT NOT NULL,
+            operator TEXT NOT NULL,
+            product TEXT,
+            description TEXT,
+            code_date TEXT,
+            number_of_cases INTEGER,
+            UNIQUE (pallet_id, timestamp, operator)
+        );
+        CREATE INDEX IF NOT EXISTS events_timestamp ON events (timestamp);
+    """
+    INSERT_EVENT = ("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (pallet_id, timestamp, operator)"
+                    " DO UPDATE SET location = excluded.location WHERE events.location = ''")
+
+    def __init__(self, db_file_path="./Data_Analysis_Suite_Output_Files/recirculation_history.db"):
+        self.db_file_path = db_file_path
+        # Another window may be adding an export, wait for it instead of failing with "database is locked"
+        self.connection = sqlite3.connect(db_file_path, timeout=120)
+        with self.connection:
+            if self.connection.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+                self.upgrade_schema()
+            self.connection.executescript(self.EVENTS_TABLE + """
+                CREATE TABLE IF NOT EXISTS exports (
+                    file_hash TEXT PRIMARY KEY,
+                    file_name TEXT,
+                    ingested_at TEXT,
+                    num_events INTEGER,
+                    num_new_events INTEGER,
+                    reference_date TEXT
+                );
+            """)
+            self.connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def upgrade_schema(self):
+        """
+        Upgrades a store created before events were matched without their location: merges the events that were stored
+        twice, once without a location, and adds the reference date of each export (unknown for the old ones).
+        """
+        tables = {name for name, in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "events" in tables:
+            self.connection.execute("DROP INDEX IF EXISTS events_timestamp")
+            self.connection.execute("ALTER TABLE events RENAME TO old_events")
+            self.connection.executescript(self.EVENTS_TABLE)
+            self.connection.execute("INSERT INTO events SELECT * FROM old_events WHERE true ORDER BY rowid"
+                                    " ON CONFLICT (pallet_id, timestamp, operator) DO UPDATE SET location = excluded.location"
+                                    " WHERE events.location = ''")
+            self.connection.execute("DROP TABLE old_events")
+        if "exports" in tables:
+            self.connection.execute("ALTER TABLE exports ADD COLUMN reference_date TEXT")
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def hash_file(file_path):
+        """
+        Returns the SHA-1 of the file's contents, used to recognize exports that were already ingested.
+        """
+        digest = hashlib.sha1()
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def reference_date(self, rpt_file_path):
+        """
+        Returns the date the year of an export's events was inferred from when it was ingested, so the same export
+        gets the same dates again even when its copy has a different modification time.
+
+        :return: The date, None if the export was not ingested yet.
+        """
+        row = self.connection.execute("SELECT reference_date FROM exports WHERE file_hash = ?", (self.hash_file(rpt_file_path),)).fetchone()
+        return date.fromisoformat(row[0]) if row and row[0] else None
+
+    def ingest(self, rpt_file_path, processor=None):
+        """
+        Adds the events of a Location Event export to the store, skipping events that are already stored.
+        The date the year of the events was inferred from is stored with the export, see reference_date.
+
+        :param rpt_file_path: The exported .rpt file.
+        :param processor: A RecirculationProcessor that already loaded this file, to avoid parsing it again.
+        :return: The number of new events, or None if this export was already ingested.
+        """
+        file_hash = self.hash_file(rpt_file_path)
+        if self.connection.execute("SELECT 1 FROM exports WHERE file_hash = ?", (file_hash,)).fetchone():
+            print(f"{os.path.basename(rpt_file_path)} was already added to the recirculation history")
+            return None
+
+        if processor is None:
+            processor = RecirculationProcessor(rpt_file_path)
+            processor.load_events()
+        events = processor.events
+        rows = zip(
+            events.values("Pallet ID"),
+            events.column("Timestamp").tolist(),
+            events.values("Location"),
+            events.values("Operator"),
+            events.values("Product"),
+            events.values("Description"),
+            events.values("Code Date"),
+            events.column("Number of Cases").tolist()
+        )
+        with self.connection:
+            num_before = self.connection.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            self.connection.executemany(self.INSERT_EVENT, rows)
+            num_new_events = self.connection.execute("SELECT COUNT(*) FROM events").fetchone()[0] - num_before
+            self.connection.execute(
+                "INSERT INTO exports VALUES (?, ?, ?, ?, ?, ?)",
+                (file_hash, os.path.basename(rpt_file_path), datetime.now().isoformat(timespec='seconds'), len(events),
+                 num_new_events, events.reference_date.isoformat())
+            )
+        print(f"Added {num_new_events} new events of {len(events)} from {os.path.basename(rpt_file_path)} to the recirculation history")
+        return num_new_events
+
+    def load_events(self, start_date=None, end_date=None):
+        """
+        Loads the stored events between two dates in chronological order.
+
+        :param start_date: First day to include, as a date or "YYYY-MM-DD", or None for no lower bound.
+        :param end_date: Last day to include, as a date or "YYYY-MM-DD", or None for no upper bound.
+        :return: The events as CirculationEvents.
+        """
+        start = self.minutes_since_1970(start_date) if start_date else None
+        end = self.minutes_since_1970(end_date) + 24 * 60 - 1 if end_date else None
+        query = ("SELECT location, operator, pallet_id, product, description, code_date, number_of_cases, timestamp FROM events"
+                 " WHERE (? IS NULL OR timestamp >= ?) AND (? IS NULL OR timestamp <= ?) ORDER BY timestamp, rowid")
+        events = CirculationEvents()
+        for row in self.connection.execute(query, (start, start, end, end)):
+            events.append(*row)
+        return events
+
+    @staticmethod
+    def minutes_since_1970(day):
+        """
+        Converts a date or "YYYY-MM-DD" string to minutes since 1970 at midnight of that day.
+        """
+        if isinstance(day, str):
+            day = datetime.strptime(day, "%Y-%m-%d").date()
+        return (day - datetime(1970, 1, 1).date()).days * 24 * 60
+
+    def create_sorted_csv(self, start_date=None, end_date=None, output_format="csv", top_k=None, show=True):
+        """
+        Writes circulation_data_sorted.csv and the recirculation plot from the stored events between two dates.
+        See RecirculationProcessor.write_sorted_csv for output_format, top_k and show.
+
+        :return: The path of the written file, None if there are no events between the dates.
+        """
+        events = self.load_events(start_date, end_date)
+        if len(events) == 0:
+            print("No recirculation history found for the selected dates")
+            return None
+        return RecirculationProcessor.from_events(events).write_sorted_csv(output_format, top_k, show=show)
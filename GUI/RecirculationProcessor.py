@@ -1,116 +1,432 @@
 import csv
 import re
-from collections import defaultdict, Counter
+import heapq
+import locale
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 import webbrowser
 import os
 
+class CirculationEvents:
+    """
+    Columnar store of "Pallet Moved To" events. Text columns hold int32 codes into the list of their distinct
+    values (in order of first appearance), the number of cases is an int32 and the date and time are one
+    int64 number of minutes since 1970, so an event costs 36 bytes plus its share of the distinct values.
+    On synthetic exports storing each event as a 10 key dict of strings took about 0.9 GB per million events,
+    this takes under 100 MB including the distinct pallet IDs.
+    """
+    TEXT_COLUMNS = ["Location", "Operator", "Pallet ID", "Product", "Description", "Code Date"]
+
+    def __init__(self, reference_date=None):
+        """
+        :param reference_date: The date of the export, the exports have no year so dates after it are from the year before.
+        """
+        self.categories = {column: [] for column in self.TEXT_COLUMNS}  # distinct values of each text column
+        self.codes = {column: array('i') for column in self.TEXT_COLUMNS}  # per event index into categories, -1 if unknown
+        self.number_of_cases = array('i')
+        self.timestamps = array('q')  # see encode_timestamp
+        self.min_timestamp = None  # earliest and latest timestamps, kept up to date as events are added
+        self.max_timestamp = None
+        self.lookups = None  # value -> code of each text column, rebuilt when needed
+        self.reference_date = reference_date or date.today()
+        self.day_starts = {}  # "MM/DD" -> minutes since 1970 at midnight of that day
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getstate__(self):
+        # The lookups can be rebuilt from the categories, no need to pickle them when sent between processes
+        state = self.__dict__.copy()
+        state['lookups'] = None
+        return state
+
+    def encode_timestamp(self, date_text, time_text):
+        """
+        Encodes "MM/DD" and "HH:MM" as minutes since 1970, placing the date in the year of the reference date
+        or the year before when it falls after the reference date (e.g. 12/31 events in an export taken on 01/02).
+        """
+        day_start = self.day_starts.get(date_text)
+        if day_start is None:
+            month, day = int(date_text[:2]), int(date_text[3:5])
+            reference = self.reference_date
+            year = reference.year if (month, day) <= (reference.month, reference.day) else reference.year - 1
+            # Adding the day as an offset also accepts 02/29 outside leap years
+            day_start = (date(year, month, 1) + timedelta(days=day - 1) - date(1970, 1, 1)).days * 24 * 60
+            self.day_starts[date_text] = day_start
+        return day_start + int(time_text[:2]) * 60 + int(time_text[3:5])
+
+    @staticmethod
+    def format_timestamps(timestamps):
+        """
+        Decodes an array of timestamps back into arrays of "MM/DD" dates and "HH:MM" times.
+        Only the distinct days and the minutes of one day are formatted, every event then just indexes into them.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        day_numbers, day_indices = np.unique(timestamps // (60 * 24), return_inverse=True)
+        days = day_numbers.astype('datetime64[D]')
+        month_starts = days.astype('datetime64[M]')
+        months = month_starts.astype(np.int64) % 12 + 1
+        day_of_month = (days - month_starts.astype('datetime64[D]')).astype(np.int64) + 1
+        dates = np.char.add(np.char.add(np.char.zfill(months.astype(str), 2), '/'), np.char.zfill(day_of_month.astype(str), 2))
+        minutes_of_day = np.arange(60 * 24)
+        times = np.char.add(np.char.add(np.char.zfill((minutes_of_day // 60).astype(str), 2), ':'), np.char.zfill((minutes_of_day % 60).astype(str), 2))
+        return dates[day_indices.reshape(timestamps.shape)], times[timestamps % (60 * 24)]
+
+    def code(self, column, value):
+        """
+        Returns the code of a value in a text column, adding it to the categories the first time it is seen.
+        """
+        if self.lookups is None:
+            self.lookups = {name: {category: code for code, category in enumerate(self.categories[name])} for name in self.TEXT_COLUMNS}
+        lookup = self.lookups[column]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.categories[column])
+            self.categories[column].append(value)
+        return code
+
+    def append(self, location, operator, pallet_id, product, description, code_date, number_of_cases, timestamp):
+        """
+        Adds one event, a location of None is stored as unknown (-1).
+        """
+        self.codes["Location"].append(-1 if location is None else self.code("Location", location))
+        self.codes["Operator"].append(self.code("Operator", operator))
+        self.codes["Pallet ID"].append(self.code("Pallet ID", pallet_id))
+        self.codes["Product"].append(self.code("Product", product))
+        self.codes["Description"].append(self.code("Description", description))
+        self.codes["Code Date"].append(self.code("Code Date", code_date))
+        self.number_of_cases.append(int(number_of_cases))
+        self.timestamps.append(timestamp)
+        if self.min_timestamp is None:
+            self.min_timestamp = self.max_timestamp = timestamp
+        elif timestamp < self.min_timestamp:
+            self.min_timestamp = timestamp
+        elif timestamp > self.max_timestamp:
+            self.max_timestamp = timestamp
+
+    def extend(self, other, last_location):
+        """
+        Appends the events of a later chunk of the same file, remapping its codes to these categories.
+
+        :param other: The CirculationEvents of the chunk.
+        :param last_location: Location of the last event before the chunk, given to its events with an unknown location.
+        :return: The location of the last event after the chunk.
+        """
+        for column in self.TEXT_COLUMNS:
+            mapping = [self.code(column, value) for value in other.categories[column]]
+            if column == "Location":
+                mapping.append(self.code(column, last_location))  # an unknown location (-1) maps to the last element
+            codes = np.asarray(mapping, dtype=np.int32)[np.frombuffer(other.codes[column], dtype=np.int32)]
+            self.codes[column].frombytes(codes.astype(np.int32).tobytes())
+        self.number_of_cases.extend(other.number_of_cases)
+        self.timestamps.extend(other.timestamps)
+        if other.min_timestamp is not None:
+            self.min_timestamp = other.min_timestamp if self.min_timestamp is None else min(self.min_timestamp, other.min_timestamp)
+            self.max_timestamp = other.max_timestamp if self.max_timestamp is None else max(self.max_timestamp, other.max_timestamp)
+        return self.categories["Location"][self.codes["Location"][-1]] if len(self) else last_location
+
+    def column(self, column):
+        """
+        Returns a column as a NumPy array, text columns as int32 codes.
+        """
+        if column == "Number of Cases":
+            return np.frombuffer(self.number_of_cases, dtype=np.int32)
+        if column == "Timestamp":
+            return np.frombuffer(self.timestamps, dtype=np.int64)
+        return np.frombuffer(self.codes[column], dtype=np.int32)
+
+    def values(self, column, indices=None):
+        """
+        Returns the text values of a column as an object array, for all events or only the given ones.
+        """
+        codes = self.column(column)
+        if indices is not None:
+            codes = codes[indices]
+        return np.asarray(self.categories[column], dtype=object)[codes]
+
+    def circulation_counts(self):
+        """
+        Returns the number of events of each pallet, indexed by pallet code.
+        """
+        return np.bincount(self.column("Pallet ID"), minlength=len(self.categories["Pallet ID"]))
+
+    def recirculations(self, top_k=None):
+        """
+        Orders the events of pallets that were moved more than once by number of circulations (descending, ties
+        in order of first appearance), keeping each pallet's events in file order.
+
+        :param top_k: Only keep the events of the top_k most recirculated pallets, picked with a heap instead of sorting every pallet.
+        :return: A tuple of (event indices, circulation number of each of those events).
+        """
+        pallet_codes = self.column("Pallet ID")
+        counts = self.circulation_counts()
+        if top_k is None:
+            pallet_rank = np.empty(len(counts), dtype=np.int64)
+            pallet_rank[np.argsort(-counts, kind='stable')] = np.arange(len(counts))
+            recirculated = np.flatnonzero(counts[pallet_codes] > 1)
+        else:
+            # nlargest keeps ties in order of first appearance, same as the full sort
+            count_list = counts.tolist()
+            top_pallets = heapq.nlargest(top_k, np.flatnonzero(counts > 1).tolist(), key=count_list.__getitem__)
+            pallet_rank = np.full(len(counts), len(top_pallets), dtype=np.int64)
+            pallet_rank[top_pallets] = np.arange(len(top_pallets))
+            recirculated = np.flatnonzero(pallet_rank[pallet_codes] < len(top_pallets))
+        order = recirculated[np.argsort(pallet_rank[pallet_codes[recirculated]], kind='stable')]
+        # Circulation number is the position of the event within its pallet's run of events
+        ordered_pallets = pallet_codes[order]
+        run_starts = np.flatnonzero(np.r_[True, ordered_pallets[1:] != ordered_pallets[:-1]]) if len(order) else np.array([], dtype=np.int64)
+        run_lengths = np.diff(np.r_[run_starts, len(order)])
+        circulation_numbers = np.arange(len(order)) - np.repeat(run_starts, run_lengths) + 1
+        return order, circulation_numbers
+
+    def recirculation_flags(self):
+        """
+        Flags every event that is not its pallet's first move in chronological order, i.e. the pallet came back.
+        """
+        order = np.argsort(self.column("Timestamp"), kind='stable')
+        _, first_moves = np.unique(self.column("Pallet ID")[order], return_index=True)
+        flags = np.ones(len(self), dtype=bool)
+        flags[order[first_moves]] = False
+        return flags
+
+    def bin_events(self, bin_minutes, offset_minutes=0):
+        """
+        Counts the events and recirculations falling in consecutive time bins from the earliest to the latest event.
+        Timestamps are absolute, so bins run across month and year boundaries without special cases.
+
+        :param bin_minutes: Length of a bin, e.g. 60 for hourly bins.
+        :param offset_minutes: Minutes after midnight the bins are aligned to, e.g. the start of the first shift.
+        :return: A tuple of (bin start timestamps, events per bin, recirculations per bin).
+        """
+        if len(self) == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        first_bin = (self.min_timestamp - offset_minutes) // bin_minutes
+        bins = (self.column("Timestamp") - offset_minutes) // bin_minutes - first_bin
+        event_counts = np.bincount(bins)
+        recirculation_counts = np.bincount(bins, weights=self.recirculation_flags(), minlength=len(event_counts)).astype(np.int64)
+        bin_starts = (np.arange(len(event_counts)) + first_bin) * bin_minutes + offset_minutes
+        return bin_starts, event_counts, recirculation_counts
+
 ## INCLUDE NOTE IN GUI TO ONLY EXPORT DATA FOR FORK_21 TO FORK_25
 class RecirculationProcessor:
-    def __init__(self, csv_file_path):
+    # Exports larger than this are parsed across a process pool by create_sorted_csv
+    PARALLEL_THRESHOLD_BYTES = 64 * 1024 * 1024
+    # Smallest byte range handed to a worker when parsing in parallel
+    MIN_CHUNK_BYTES = 1024 * 1024
+    # Three 8 hour shifts, the first starting at 06:00
+    SHIFT_START_MINUTES = 6 * 60
+    SHIFT_LENGTH_MINUTES = 8 * 60
+    SHIFT_NAMES = ["1st Shift", "2nd Shift", "3rd Shift"]
+    # Outputs with more rows than this are not opened in the browser, it cannot display them anyway
+    AUTO_OPEN_MAX_ROWS = 100000
+
+    def __init__(self, csv_file_path, reference_date=None):
+        """
+        :param csv_file_path: The exported .rpt file.
+        :param reference_date: The day the file was exported, by default its modification date. The export has no year,
+                               events are placed in the year up to this day.
+        """
         # Define the input file name
         self.input_file = csv_file_path
-        # circulation_data = defaultdict(list)
         # self.create_sorted_csv(input_file)
-        # self.plot_data(circulation_data)
-        self.datetime_entries = []
+        # self.plot_data()
+        if reference_date is None and csv_file_path:
+            reference_date = date.fromtimestamp(os.path.getmtime(csv_file_path))
+        self.events = CirculationEvents(reference_date)
+        # Define a regex pattern to match the relevant rows
+        self.pattern = re.compile(r'^\s*(\w+)?\s+(\w+)\s+(Pallet Moved (From|To))\s+(\w+)\s+(\w+)\s+(.+?)\s+(\d{6})\s+(\d+)\s+(\d{2}/\d{2})\s+(\d{2}:\d{2})$')
 
-    def create_sorted_csv(self):
-        # Define the headers for the CSV file
-        headers = ["Location", "Operator", "Event", "Pallet ID", "Product", "Description", "Code Date", "Number of Cases", "Date", "Time"]
+    @classmethod
+    def from_events(cls, events):
+        """
+        Creates a processor for events that were already loaded, e.g. from the RecirculationHistory store.
+        """
+        processor = cls(None)
+        processor.events = events
+        return processor
 
-        # Initialize data structures
-        circulation_data = defaultdict(list)
-        datetime_entries = self.datetime_entries
+    def read_lines(self, start=0, end=None):
+        """
+        Lazily reads the lines of the input file, or only the lines starting within the byte range [start, end).
+        A line that straddles start belongs to the previous range, so consecutive ranges cover every line exactly once.
 
-        # Read the input file
-        with open(self.input_file, "r") as file:
-            lines = file.readlines()
+        :param start: Byte offset of the range.
+        :param end: Byte offset the range stops before, or None to read the whole file.
+        :return: A generator of lines.
+        """
+        if start == 0 and end is None:
+            with open(self.input_file, "r") as file:
+                yield from file
+            return
 
-        # Define a regex pattern to match the relevant rows
-        pattern = re.compile(r'^\s*(\w+)?\s+(\w+)\s+(Pallet Moved (From|To))\s+(\w+)\s+(\w+)\s+(.+?)\s+(\d{6})\s+(\d+)\s+(\d{2}/\d{2})\s+(\d{2}:\d{2})$')
+        encoding = locale.getpreferredencoding(False)
+        with open(self.input_file, "rb") as file:
+            if start > 0:
+                file.seek(start - 1)
+                if file.read(1) != b"\n":
+                    file.readline()  # skip the rest of the line owned by the previous range
+            position = file.tell()
+            while position < end:
+                line = file.readline()
+                if not line:
+                    break
+                position += len(line)
+                yield line.decode(encoding, errors="replace").rstrip("\r\n")
 
-        # Store the last known location to handle lines without location information
-        last_location = ""
+    def read_events(self, start=0, end=None, last_location=""):
+        """
+        Lazily reads the input file one line at a time and yields every "Pallet Moved To" event.
+        Lines without the event text are skipped with a substring check before running the regex.
 
-        # Process each line directly to extract data
-        for line in lines:
-            match = pattern.match(line)
+        :param start: Byte offset to start reading from, see read_lines.
+        :param end: Byte offset to stop reading at, or None to read the whole file.
+        :param last_location: Location given to events before the first row with a location.
+        :return: A generator of (location, operator, event, pallet ID, product, description, code date, number of cases, date, time) tuples.
+        """
+        # last_location stores the last known location to handle lines without location information
+        for line in self.read_lines(start, end):
+            if "Pallet Moved To" not in line:
+                continue
+            match = self.pattern.match(line)
             if match:
                 event = match.group(3).strip()
                 if event == "Pallet Moved To":
                     location = match.group(1) if match.group(1) else last_location
-                    operator = match.group(2)
-                    pallet_id = match.group(5)
-                    product = match.group(6)
-                    description = match.group(7).strip()
-                    code_date = match.group(8)
-                    number_of_cases = match.group(9)
-                    date = match.group(10)
-                    time = match.group(11)
-
                     # Update the last known location
                     last_location = location
+                    yield (location, match.group(2), event, match.group(5), match.group(6), match.group(7).strip(),
+                           match.group(8), match.group(9), match.group(10), match.group(11))
 
-                    # Append the extracted data to the circulation data
-                    row = {
-                        "Location": location,
-                        "Operator": operator,
-                        "Event": event,
-                        "Pallet ID": pallet_id,
-                        "Product": product,
-                        "Description": description,
-                        "Code Date": code_date,
-                        "Number of Cases": number_of_cases,
-                        "Date": date,
-                        "Time": time
-                    }
-                    circulation_data[pallet_id].append(row)
-                    datetime_entries.append(f"{date} {time}")
+    def add_events(self, events):
+        """
+        Stores each event in the columnar event store.
 
+        :param events: Event tuples from read_events.
+        """
+        append = self.events.append
+        encode_timestamp = self.events.encode_timestamp
+        for location, operator, event, pallet_id, product, description, code_date, number_of_cases, date_text, time_text in events:
+            append(location, operator, pallet_id, product, description, code_date, number_of_cases, encode_timestamp(date_text, time_text))
+
+    def read_circulation_data_parallel(self, max_workers=None):
+        """
+        Splits the input file into byte ranges and parses them in a process pool, then merges the chunks'
+        events in file order so the result is identical to parsing the file sequentially.
+
+        :param max_workers: Number of worker processes, defaults to the number of CPU cores.
+        """
+        file_size = os.path.getsize(self.input_file)
+        num_chunks = (max_workers or os.cpu_count() or 1) * 4
+        chunk_size = max(file_size // num_chunks + 1, self.MIN_CHUNK_BYTES)
+        starts = list(range(0, file_size, chunk_size))
+        ends = starts[1:] + [file_size]
+
+        last_location = ""
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for chunk_events in executor.map(parse_chunk, [self.input_file] * len(starts), starts, ends,
+                                             [self.events.reference_date] * len(starts)):
+                # Events before the chunk's first location continue the location of the previous chunk
+                last_location = self.events.extend(chunk_events, last_location)
+
+    def create_sorted_csv(self, parallel=None, max_workers=None, output_format="csv", top_k=None):
+        """
+        Writes the pallets that were moved to a location more than once to circulation_data_sorted.csv and plots them.
+
+        :param parallel: Parse the file in a process pool, by default only when the file is larger than PARALLEL_THRESHOLD_BYTES.
+        :param max_workers: Number of worker processes for parallel parsing.
+        :param output_format: "csv", "parquet" or "feather", see write_sorted_csv.
+        :param top_k: Only write the top_k most recirculated pallets.
+        """
+        self.load_events(parallel, max_workers)
+        self.write_sorted_csv(output_format, top_k)
+
+    def load_events(self, parallel=None, max_workers=None):
+        """
+        Parses the input file into self.events.
+
+        :param parallel: Parse the file in a process pool, by default only when the file is larger than PARALLEL_THRESHOLD_BYTES.
+        :param max_workers: Number of worker processes for parallel parsing.
+        """
+        if parallel is None:
+            parallel = os.path.getsize(self.input_file) > self.PARALLEL_THRESHOLD_BYTES
+        if parallel:
+            self.read_circulation_data_parallel(max_workers)
+        else:
+            # Process each "Pallet Moved To" event as it is read from the file
+            self.add_events(self.read_events())
+
+    def write_sorted_csv(self, output_format="csv", top_k=None, open_csv=True, show=True):
+        """
+        Writes the pallets of self.events that were moved to a location more than once to circulation_data_sorted.csv and plots them.
+
+        :param output_format: "csv", or "parquet"/"feather" (needs pyarrow) for outputs too large to handle as text.
+        :param top_k: Only write the top_k most recirculated pallets.
+        :param open_csv: Open the CSV once it is written, if it has at most AUTO_OPEN_MAX_ROWS rows.
+        :param show: Show the plots in windows after saving them.
+        :return: The path of the written file, None if there are no events.
+        """
+        if len(self.events) == 0:
+            print("No 'Pallet Moved To' events found, nothing to write")
+            return None
         # Sort the pallet IDs by the number of circulations, descending
-        sorted_circulation_data = sorted(circulation_data.items(), key=lambda x: len(x[1]), reverse=True)
-
-        # Write the sorted circulation data to a new CSV file
-        output_circulation_file = "./Data_Analysis_Suite_Output_Files/circulation_data_sorted.csv"
-        with open(output_circulation_file, 'w', newline='') as csvfile:
-            fieldnames = ['Pallet ID', 'Product ID', 'Circulation Number', 'Location (Inflow)', 'Date', 'Time']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for pallet_id, entries in sorted_circulation_data:
-                if len(entries) > 1:  # Only consider pallet IDs that appear more than once
-                    for i, entry in enumerate(entries):
-                        writer.writerow({
-                            'Pallet ID': pallet_id,
-                            'Product ID': entry['Product'],
-                            'Circulation Number': i + 1,
-                            'Location (Inflow)': entry['Location'],
-                            'Date': entry['Date'],
-                            'Time': entry['Time']
-                        })
+        events = self.events
+        order, circulation_numbers = events.recirculations(top_k)
+        dates, times = events.format_timestamps(events.column("Timestamp")[order])
+        columns = {
+            'Pallet ID': events.values("Pallet ID", order),
+            'Product ID': events.values("Product", order),
+            'Circulation Number': circulation_numbers,
+            'Location (Inflow)': events.values("Location", order),
+            'Date': dates,
+            'Time': times
+        }
+
+        output_circulation_file = f"./Data_Analysis_Suite_Output_Files/circulation_data_sorted.{output_format}"
+        if output_format in ("parquet", "feather"):
+            try:
+                frame = pd.DataFrame({name: pd.Categorical(values) if values.dtype == object else values for name, values in columns.items()})
+                if output_format == "parquet":
+                    frame.to_parquet(output_circulation_file, index=False)
+                else:
+                    frame.to_feather(output_circulation_file)
+            except ImportError:
+                print(f"Writing {output_format} files needs pyarrow installed, writing a CSV file instead")
+                output_format = "csv"
+                output_circulation_file = "./Data_Analysis_Suite_Output_Files/circulation_data_sorted.csv"
+        if output_format == "csv":
+            write_csv_columns(output_circulation_file, columns)
 
         print(f"Circulation data has been successfully written to {output_circulation_file} saved in ./Data_Analysis_Suite_Output_Files")
-        output_file = os.path.abspath('./Data_Analysis_Suite_Output_Files/circulation_data_sorted.csv')
-        webbrowser.open_new(output_file)
+        if open_csv and output_format == "csv" and len(order) <= self.AUTO_OPEN_MAX_ROWS:
+            output_file = os.path.abspath(output_circulation_file)
+            webbrowser.open_new(output_file)
         # webbrowser.open(output_circulation_file)
-        self.plot_data(circulation_data)
+        self.plot_data(show)
+        self.plot_recirculation_rate(show)
+        return output_circulation_file
 
 
-    def plot_data(self,circulation_data):
+    def plot_data(self, show=True):
+        if len(self.events) == 0:
+            print("No 'Pallet Moved To' events found, nothing to plot")
+            return
         # Get the number of recirculations for each pallet ID
-        recirculation_counts = {k: len(v) for k, v in circulation_data.items() if len(v) > 1}
-        
-        # Count occurrences of each recirculation count
-        occurrence_counts = Counter(recirculation_counts.values())
+        recirculation_counts = self.events.circulation_counts()
+        recirculation_counts = recirculation_counts[recirculation_counts > 1]
 
-        # Prepare data for plotting
-        recirculation_numbers = sorted(occurrence_counts.keys())
-        occurrences = [occurrence_counts[n] for n in recirculation_numbers]
+        # Count occurrences of each recirculation count
+        recirculation_numbers, occurrences = np.unique(recirculation_counts, return_counts=True)
+        recirculation_numbers = recirculation_numbers.tolist()
+        occurrences = occurrences.tolist()
 
-        # Sort datetime entries to find the earliest and latest
-        datetime_entries = sorted(self.datetime_entries)
-        earliest_datetime = datetime_entries[0]
-        latest_datetime = datetime_entries[-1]
+        # Find the earliest and latest events
+        (earliest_date, latest_date), (earliest_time, latest_time) = self.events.format_timestamps([self.events.min_timestamp, self.events.max_timestamp])
+        earliest_datetime = f"{earliest_date} {earliest_time}"
+        latest_datetime = f"{latest_date} {latest_time}"
 
         # Create the plot
         plt.figure(figsize=(10, 6))
@@ -132,9 +448,94 @@ class RecirculationProcessor:
         plt.savefig(output_plot)
 
         print(f"Circulation data has been successfully plotted to {output_plot} saved in ./Data_Analysis_Suite_Output_Files")
-        plt.show()
+        if show:
+            plt.show()
+        else:
+            plt.close()
+
+    def plot_recirculation_rate(self, show=True):
+        """
+        Writes the number of events, recirculations and the recirculation rate of every hour to recirculation_rate.csv
+        and plots the hourly rate over time together with the rate of every shift.
+
+        :param show: Show the plot in a window after saving it.
+        """
+        if len(self.events) == 0:
+            print("No 'Pallet Moved To' events found, nothing to plot")
+            return
+        hour_starts, hour_events, hour_recirculations = self.events.bin_events(60)
+        shift_starts, shift_events, shift_recirculations = self.events.bin_events(self.SHIFT_LENGTH_MINUTES, self.SHIFT_START_MINUTES)
+        # Hours without any events have no rate
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hour_rates = np.where(hour_events > 0, hour_recirculations / hour_events * 100, np.nan)
+            shift_rates = np.where(shift_events > 0, shift_recirculations / shift_events * 100, np.nan)
+
+        output_rate_file = "./Data_Analysis_Suite_Output_Files/recirculation_rate.csv"
+        # The rate of an hour without events is left empty in the CSV
+        rate_cells = np.round(hour_rates, 2).astype(object)
+        rate_cells[hour_events == 0] = ''
+        dates, times = self.events.format_timestamps(hour_starts)
+        shifts = np.asarray(self.SHIFT_NAMES, dtype=object)[(hour_starts - self.SHIFT_START_MINUTES) % (24 * 60) // self.SHIFT_LENGTH_MINUTES]
+        with open(output_rate_file, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Date', 'Hour', 'Shift', 'Events', 'Recirculations', 'Recirculation Rate (%)'])
+            writer.writerows(zip(dates.tolist(), times.tolist(), shifts.tolist(), hour_events.tolist(), hour_recirculations.tolist(),
+                                 rate_cells.tolist()))
+        print(f"Recirculation rate per hour has been successfully written to {output_rate_file} saved in ./Data_Analysis_Suite_Output_Files")
+
+        # Timestamps are minutes since 1970, which datetime64[m] takes as is
+        fig, (hour_axis, shift_axis) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
+        hour_axis.plot(hour_starts.astype('datetime64[m]'), hour_rates, color='skyblue', linewidth=1)
+        hour_axis.set_ylabel('Recirculation Rate per Hour (%)')
+        hour_axis.grid(True, linestyle='--', linewidth=0.5)
+        shift_axis.bar(shift_starts.astype('datetime64[m]'), shift_rates, width=self.SHIFT_LENGTH_MINUTES / (24 * 60), align='edge',
+                       color=np.array(['tab:blue', 'tab:orange', 'tab:green'])[(shift_starts - self.SHIFT_START_MINUTES) % (24 * 60) // self.SHIFT_LENGTH_MINUTES])
+        shift_axis.set_ylabel('Recirculation Rate per Shift (%)')
+        shift_axis.set_xlabel('Time')
+        shift_axis.grid(True, linestyle='--', linewidth=0.5)
+        (earliest_date, latest_date), (earliest_time, latest_time) = self.events.format_timestamps([self.events.min_timestamp, self.events.max_timestamp])
+        fig.suptitle(f'Recirculation Rate From {earliest_date} {earliest_time} to {latest_date} {latest_time}')
+        fig.autofmt_xdate()
+        fig.tight_layout()
+
+        output_plot = './Data_Analysis_Suite_Output_Files/recirculation_rate_plot.png'
+        fig.savefig(output_plot)
+        print(f"Recirculation rate has been successfully plotted to {output_plot} saved in ./Data_Analysis_Suite_Output_Files")
+        if show:
+            plt.show()
+        else:
+            plt.close(fig)
 
     # if __name__ == "__main__":
     #     obj=RecirculationProcessor('input_2.rpt')
     #     obj.create_sorted_csv()
     #     print("done")
+
+def write_csv_columns(file_path, columns, block_rows=100000):
+    """
+    Writes equally long columns to a CSV file, joining a block of rows at a time into one string. The values
+    are pallet IDs, product codes, locations, dates and numbers, which never need quoting, so this skips csv.writer.
+
+    :param file_path: The CSV file to write.
+    :param columns: Dict of column name to array of values.
+    :param block_rows: Number of rows joined into one string before writing it.
+    """
+    with open(file_path, 'w', newline='') as csvfile:
+        csvfile.write(",".join(columns) + "\r\n")
+        values = list(columns.values())
+        num_rows = len(values[0]) if values else 0
+        for start in range(0, num_rows, block_rows):
+            block = [np.asarray(column[start:start + block_rows]) for column in values]
+            block = [column.tolist() if column.dtype.kind in "OU" else column.astype(str).tolist() for column in block]
+            csvfile.write("\r\n".join(map(",".join, zip(*block))))
+            csvfile.write("\r\n")
+
+def parse_chunk(input_file, start, end, reference_date=None):
+    """
+    Parses the events of one byte range of a Location Event export, used as the worker of read_circulation_data_parallel.
+
+    :return: The chunk's CirculationEvents, events before its first location have an unknown location.
+    """
+    processor = RecirculationProcessor(input_file, reference_date)
+    processor.add_events(processor.read_events(start, end, last_location=None))
+    return processor.events
@@ -0,0 +1,198 @@
+import os
+import random
+from datetime import date, datetime, timedelta
+
+# Pallet sizes seen on the floor, the ones not divisible by 6 are partial pallets
+PALLET_SIZES = [36, 42, 48, 60, 66, 78, 5, 7, 40]
+
+def generate_blind_receiver(rpt_file_path, num_sections=100, seed=0):
+    """
+    Writes a synthetic Blind Receiver/Cover Sheet .rpt with Pos, Even and Neg quantity sections.
+    Each section is a product quantity row followed by its timestamped pallet rows, some of which
+    are at inaccessible locations.
+
+    :param rpt_file_path: Where to write the .rpt file.
+    :param num_sections: Number of product sections in the trip.
+    :param seed: Seed for the random generator so runs are repeatable.
+    :return: The number of lines written.
+    """
+    rng = random.Random(seed)
+    lines = [
+        "                         BLIND RECEIVER / COVER SHEET",
+        f"  Trip: {rng.randint(10000, 99999)}      Acceptance: ________",
+        "",
+    ]
+    minute = 6 * 60
+    for section in range(num_sections):
+        order_qty = rng.choice([36, 42, 48, 60, 66])
+        kind = rng.choice(['Pos', 'Even', 'Even', 'Neg'])
+        if kind == 'Pos':
+            received_qty = order_qty + rng.randint(1, 6)
+        elif kind == 'Neg':
+            received_qty = order_qty - rng.randint(1, 6)
+        else:
+            received_qty = order_qty
+        lines.append(f"{rng.randint(100000, 999999)}  PRODUCT {section:05d} DESCRIPTION      {order_qty:>4}  {received_qty:>4}  {abs(received_qty - order_qty):>3}")
+        for pallet in range(rng.randint(2, 8)):
+            minute = (minute + rng.randint(0, 5)) % (24 * 60)
+            prefix = f"{rng.randint(100000, 999999)}" if rng.random() < 0.9 else "  !"
+            location = rng.choice(['AB', 'CD', 'EF', 'D12', 'T3'])  # D12 and T3 are inaccessible locations
+            lines.append(f"{prefix}  FE3V{rng.randint(1000, 9999)}  {minute // 60}:{minute % 60:02d}  {rng.choice(PALLET_SIZES)} {location}")
+        lines.append("")
+
+    with open(rpt_file_path, 'w') as rpt_file:
+        rpt_file.write("\n".join(lines) + "\n")
+    return len(lines)
+
+def generate_location_events(rpt_file_path, num_events=10000, num_pallets=None, seed=0):
+    """
+    Writes a synthetic Location Event .rpt export for Fork_21 to Fork_25, mixing "Pallet Moved To" and
+    "Pallet Moved From" events with other event types and page headers. The location is only printed on
+    the first row of each location block, like the ICS export.
+
+    :param rpt_file_path: Where to write the .rpt file.
+    :param num_events: Number of event rows to write.
+    :param num_pallets: Size of the pallet ID pool, smaller pools give more recirculations.
+    :param seed: Seed for the random generator so runs are repeatable.
+    :return: The number of lines written.
+    """
+    rng = random.Random(seed)
+    num_pallets = num_pallets or max(num_events // 4, 1)
+    pallets = [f"FE3V{index:04X}" for index in range(num_pallets)]
+    products = [(f"{rng.randint(1000000, 9999999):08d}", description) for description in
+                ["DORITOS NACHO CHEESE 1OZ", "LAYS CLASSIC 2.625OZ", "CHEETOS CRUNCHY 8.5OZ", "FRITOS ORIGINAL 9.25OZ", "RUFFLES CHEDDAR SOUR CREAM"]]
+    other_events = ["Pallet Created", "Pallet Scanned", "Location Inventoried"]
+    location = None
+    month, day, minute = 7, 1, 0
+    num_lines = 0
+    with open(rpt_file_path, 'w') as rpt_file:
+        for index in range(num_events):
+            if index % 55 == 0:
+                rpt_file.write(f"\nLocation Event Report                                  Page {index // 55 + 1}\n"
+                               "Location   Operator  Event              Pallet ID  Product   Description                  Code Date  Cases  Date   Time\n")
+                num_lines += 3
+            new_location = f"FORK_{rng.randint(21, 25)}" if rng.random() < 0.1 or location is None else location
+            printed_location = new_location if new_location != location else ""
+            location = new_location
+            minute += rng.randint(0, 3)
+            if minute >= 24 * 60:
+                minute -= 24 * 60
+                day += 1
+                if day > 28:
+                    month, day = month % 12 + 1, 1
+            roll = rng.random()
+            event = "Pallet Moved To" if roll < 0.5 else "Pallet Moved From" if roll < 0.9 else rng.choice(other_events)
+            product, description = rng.choice(products)
+            rpt_file.write(f"{printed_location:<10} {rng.randint(100, 399):>8}  {event:<18} {rng.choice(pallets)}  {product}  {description:<28} "
+                           f"{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}24  {rng.choice([36, 42, 48, 60, 66]):>5}  "
+                           f"{month:02d}/{day:02d}  {minute // 60:02d}:{minute % 60:02d}\n")
+            num_lines += 1
+    return num_lines
+
+# Vehicle alarm types reported by ATOM, the generator numbers them past this list
+FAULT_TYPES = ["Obstacle Detected", "Lost Navigation", "Battery Low", "Load Not Detected", "Fork Position Error",
+               "Drive Motor Fault", "Emergency Stop", "Bumper Hit", "Charger Fault", "Lift Timeout"]
+
+def generate_atom_alarm_summary(csv_file_path, num_vehicles=50, num_fault_types=60, seed=0):
+    """
+    Writes a synthetic ATOM Vehicle Alarm Summary export grouped by Vehicle Alarm Type: a title row, a
+    "Name" row with the vehicle numbers and a Total column, then one row of counts per fault type.
+    Most vehicles have no alarms of most types, like the real exports.
+
+    :param csv_file_path: Where to write the .csv file.
+    :param num_vehicles: Number of vehicle columns.
+    :param num_fault_types: Number of fault type rows.
+    :param seed: Seed for the random generator so runs are repeatable.
+    :return: The number of rows written.
+    """
+    rng = random.Random(seed)
+    fault_types = [FAULT_TYPES[index] if index < len(FAULT_TYPES) else f"Vehicle Alarm {index:03d}" for index in range(num_fault_types)]
+    with open(csv_file_path, 'w') as csv_file:
+        csv_file.write("Vehicle Alarm Summary\n")
+        csv_file.write(",".join(["Name"] + [str(vehicle) for vehicle in range(1, num_vehicles + 1)] + ["Total"]) + "\n")
+        for fault_type in fault_types:
+            counts = [rng.randint(1, 20) if rng.random() < 0.2 else 0 for _ in range(num_vehicles)]
+            csv_file.write(",".join([fault_type] + [str(count) for count in counts] + [str(sum(counts))]) + "\n")
+    return num_fault_types + 2
+
+def generate_atom_alarm_history(folder, num_days=30, num_vehicles=50, num_fault_types=60, start_date=date(2026, 1, 1), seed=0):
+    """
+    Writes one synthetic ATOM Vehicle Alarm Summary export per day into a folder, named
+    Vehicle_Alarm_Summary_YYYY-MM-DD.csv. Every tenth vehicle gets steadily more alarms over the days so
+    trend analyses have something to find.
+
+    :param folder: Folder to write the exports to, created if missing.
+    :param num_days: Number of daily exports.
+    :param num_vehicles: Number of vehicle columns.
+    :param num_fault_types: Number of fault type rows.
+    :param start_date: Date of the first export.
+    :param seed: Seed for the random generator so runs are repeatable.
+    :return: The paths of the written exports.
+    """
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    fault_types = [FAULT_TYPES[index] if index < len(FAULT_TYPES) else f"Vehicle Alarm {index:03d}" for index in range(num_fault_types)]
+    paths = []
+    for day in range(num_days):
+        csv_file_path = os.path.join(folder, f"Vehicle_Alarm_Summary_{start_date + timedelta(days=day)}.csv")
+        with open(csv_file_path, 'w') as csv_file:
+            csv_file.write("Vehicle Alarm Summary\n")
+            csv_file.write(",".join(["Name"] + [str(vehicle) for vehicle in range(1, num_vehicles + 1)] + ["Total"]) + "\n")
+            for fault_type in fault_types:
+                counts = []
+                for vehicle in range(1, num_vehicles + 1):
+                    trend = 1 + day / 5 if vehicle % 10 == 0 else 1
+                    counts.append(int(rng.randint(1, 5) * trend) if rng.random() < 0.2 else 0)
+                csv_file.write(",".join([fault_type] + [str(count) for count in counts] + [str(sum(counts))]) + "\n")
+        paths.append(csv_file_path)
+    return paths
+
+def generate_pallet_history(text_file_path, num_moves=1000, num_locations=1, mix_rate=0.1, seed=0):
+    """
+    Writes a synthetic ICS Pallet History dump of EVT1/EVT2 line pairs. AGVs drop pallets at the AGVO_01..AGVO_n
+    outfeed stations and forklifts take them away, usually first in first out but out of order (mixed) at mix_rate.
+    Some pallets come back to a station later, and a few other event types are mixed in.
+
+    :param text_file_path: Where to write the text file.
+    :param num_moves: Number of pallet moves to write.
+    :param num_locations: Number of AGVO stations.
+    :param mix_rate: Chance that a departing pallet is not the one that has waited longest.
+    :param seed: Seed for the random generator so runs are repeatable.
+    :return: The number of lines written.
+    """
+    rng = random.Random(seed)
+    locations = [f"AGVO_{index:02d}" for index in range(1, num_locations + 1)]
+    queues = {location: [] for location in locations}
+    timestamp = datetime(2023, 7, 13, 6, 0, 0)
+    next_pallet = 0
+    departed = []
+    num_lines = 0
+    with open(text_file_path, 'w') as text_file:
+        for _ in range(num_moves):
+            timestamp += timedelta(seconds=rng.randint(1, 120))
+            if (timestamp.month, timestamp.day) == (2, 29):
+                timestamp += timedelta(days=1)  # the dump has no year, so the parser cannot accept Feb 29
+            if rng.random() < 0.05:
+                text_file.write(f"EVT1 {timestamp:%b %d %H:%M:%S} I-OPRCRTMOV\n"
+                                f"EVT2 Opr {rng.randint(100, 399)} Created Moveable FE3V{rng.randint(0, 0xFFFF):04X} Shift: C\n")
+                num_lines += 2
+            location = rng.choice(locations)
+            queue = queues[location]
+            product = f"{rng.randint(1000000, 9999999):08d}"
+            if not queue or (rng.random() < 0.5 and len(queue) < 20):
+                if departed and rng.random() < 0.05:
+                    pallet_id = departed.pop(rng.randrange(len(departed)))
+                else:
+                    pallet_id = f"FE3V{next_pallet:04X}"
+                    next_pallet += 1
+                agv = f"AGV{rng.randint(1, 20):02d}"
+                queue.append(pallet_id)
+                move = f"Opr {agv} Moved Moveable {pallet_id} From {agv} (Type T) To {location} (Type S)"
+            else:
+                pallet_id = queue.pop(rng.randrange(1, len(queue)) if len(queue) > 1 and rng.random() < mix_rate else 0)
+                departed.append(pallet_id)
+                move = f"Opr {rng.randint(100, 399)} Moved Moveable {pallet_id} From {location} (Type S) To FORK{rng.randint(10, 80)} (Type T)"
+            text_file.write(f"EVT1 {timestamp:%b %d %H:%M:%S} I-OPRMOVMOV\n"
+                            f"EVT2 {move} With {rng.choice([36, 42, 48, 60, 66])} Of {product} (0{rng.randint(1, 9)}1524) Shift: C\n")
+            num_lines += 2
+    return num_lines
@@ -0,0 +1,244 @@
+"""
+Times every processor on synthetic inputs of several sizes and flags regressions against a saved baseline.
+
+    python -m benchmarks.BenchmarkSuite --save-baseline     # measure and keep the results as the baseline
+    python -m benchmarks.BenchmarkSuite                     # measure and compare against the baseline
+    python -m benchmarks.BenchmarkSuite --quick             # only the smaller sizes
+
+Each processor run is split into parse, analyze and render stages. The time of every stage is measured in fresh
+worker processes, keeping the fastest of a few runs, and its peak memory in another. Tracing memory slows pure Python
+code down too much to time it at the same time.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+import matplotlib
+matplotlib.use('Agg')
+from BlindReceiverHighlighter import BFHighlighter
+from FaultPlotter import FaultPlotter
+from FaultHistory import FaultHistory
+from FaultAnomalyDetector import FaultAnomalyDetector
+from RecirculationProcessor import RecirculationProcessor
+from MixIdentifier import MixIdentifier
+from FifoAnalyzer import FifoAnalyzer
+from SyntheticData import (generate_blind_receiver, generate_location_events, generate_atom_alarm_summary,
+                           generate_atom_alarm_history, generate_pallet_history)
+from benchmarks.Timing import best_of
+
+# Processor -> (what the size counts, sizes). 500 pallet moves still draw the mix diagram, larger histories skip it.
+SIZES = {
+    "blind-receiver": ("sections", [100, 1000, 10000]),
+    "recirculation": ("events", [10000, 100000, 500000]),
+    "faults": ("vehicles", [50, 200, 500]),
+    "fault-trends": ("days", [30, 90, 365]),
+    "pallet-history": ("moves", [500, 1000, 10000, 100000]),
+}
+DEFAULT_BASELINE = "./Data_Analysis_Suite_Output_Files/benchmark_baseline.json"
+
+class StageRecorder:
+    """
+    Records the time, or the peak traced memory, of each stage of a run.
+    """
+    def __init__(self, trace_memory):
+        self.trace_memory = trace_memory
+        self.values = {}
+
+    @contextmanager
+    def stage(self, name):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            yield
+            self.values[name] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        else:
+            start = time.perf_counter()
+            yield
+            self.values[name] = time.perf_counter() - start
+
+def generate_input(processor, size, folder):
+    """
+    Writes the synthetic input of a processor into the folder and returns its path.
+    """
+    if processor == "blind-receiver":
+        path = os.path.join(folder, "blind_receiver.rpt")
+        generate_blind_receiver(path, size)
+    elif processor == "recirculation":
+        path = os.path.join(folder, "location_events.rpt")
+        generate_location_events(path, size)
+    elif processor == "faults":
+        path = os.path.join(folder, "alarm_summary.csv")
+        generate_atom_alarm_summary(path, size)
+    elif processor == "fault-trends":
+        path = os.path.join(folder, "alarm_history")
+        generate_atom_alarm_history(path, num_days=size, num_vehicles=100)
+    else:
+        path = os.path.join(folder, "pallet_history.txt")
+        generate_pallet_history(path, size)
+    return path
+
+def run_stages(processor, input_path, recorder):
+    if processor == "blind-receiver":
+        with recorder.stage("parse"):
+            BFH = BFHighlighter(input_path)
+        with recorder.stage("analyze"):
+            BFH.find_highlight_rows()
+        with recorder.stage("render"):
+            BFH.render_pdf(BFH.format_rows(), "./Data_Analysis_Suite_Output_Files/Blind_Receiver_highlighted.pdf")
+    elif processor == "recirculation":
+        with recorder.stage("parse"):
+            RCProcessor = RecirculationProcessor(input_path)
+            RCProcessor.load_events(parallel=False)
+        with recorder.stage("analyze"):
+            RCProcessor.events.recirculations()
+            RCProcessor.events.bin_events(60)
+        with recorder.stage("render"):
+            RCProcessor.write_sorted_csv(open_csv=False, show=False)
+    elif processor == "faults":
+        fault_plotter = FaultPlotter(input_path)
+        with recorder.stage("parse"):
+            fault_plotter.read_fault_counts()
+        with recorder.stage("render"):
+            fault_plotter.plot_faults(open_html=False)
+    elif processor == "fault-trends":
+        with recorder.stage("parse"):
+            fault_history = FaultHistory(input_path, cache_dir=tempfile.mkdtemp(dir="."))
+            history = fault_history.load(max_workers=1)
+        with recorder.stage("analyze"):
+            detector = FaultAnomalyDetector(history, export_dates=fault_history.export_dates)
+            detector.rank_vehicles()
+        with recorder.stage("render"):
+            detector.create_report(open_html=False)
+    else:
+        with recorder.stage("parse"):
+            mix_identifier = MixIdentifier.from_file("AGVO_01", input_path)
+            mix_identifier.read_moves()
+            mix_identifier.find_time_range()
+        with recorder.stage("analyze"):
+            FifoAnalyzer(mix_identifier)
+        with recorder.stage("render"):
+            mix_identifier.create_outputs(show=False)
+
+def run_case(processor, input_path, trace_memory):
+    """
+    Runs one processor on one input in an empty working folder, used as the worker of measure.
+
+    :return: Dictionary of stage -> seconds, or peak MB when trace_memory is set.
+    """
+    previous_dir = os.getcwd()
+    recorder = StageRecorder(trace_memory)
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        os.makedirs("Data_Analysis_Suite_Output_Files")
+        if trace_memory:
+            tracemalloc.start()
+        try:
+            with redirect_stdout(io.StringIO()):
+                run_stages(processor, input_path, recorder)
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+            os.chdir(previous_dir)
+    return recorder.values
+
+def measure(processor, input_path, trace_memory):
+    # A fresh process for every run, so caches and memory left over from earlier runs do not count
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(run_case, processor, input_path, trace_memory).result()
+
+def run_suite(processors=None, quick=False, repeats=2):
+    """
+    Measures every stage of every processor at each of its sizes.
+
+    :param processors: Names from SIZES to run, all by default.
+    :param quick: Leave out the largest size.
+    :param repeats: Timed runs of each size, the fastest time of every stage is kept to filter out noise.
+    :return: The results, with one record of processor, size, stage, seconds and peak MB per stage.
+    """
+    records = []
+    for processor in processors or SIZES:
+        unit, sizes = SIZES[processor]
+        for size in sizes[:-1] if quick else sizes:
+            with tempfile.TemporaryDirectory() as input_dir:
+                input_path = generate_input(processor, size, input_dir)
+                seconds = best_of(measure, processor, input_path, False, repeats=repeats)
+                peaks = measure(processor, input_path, trace_memory=True)
+            for stage in seconds:
+                records.append({"processor": processor, "size": size, "unit": unit, "stage": stage,
+                                "seconds": round(seconds[stage], 4), "peak_mb": round(peaks[stage], 2)})
+                print(f"{processor:>15} {size:>8} {unit:<9} {stage:<8} {seconds[stage]:>9.3f}s {peaks[stage]:>9.1f} MB")
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "records": records,
+    }
+
+def find_regressions(results, baseline, threshold=0.25, min_seconds=0.05, min_mb=5):
+    """
+    Compares results against a baseline. A stage regressed when it takes more than threshold (a fraction) longer or
+    more memory than in the baseline, and by more than min_seconds or min_mb so timer noise on tiny stages is ignored.
+
+    :return: List of (record, baseline record, what regressed) tuples.
+    """
+    baseline_records = {(record["processor"], record["size"], record["stage"]): record for record in baseline["records"]}
+    regressions = []
+    for record in results["records"]:
+        previous = baseline_records.get((record["processor"], record["size"], record["stage"]))
+        if previous is None:
+            continue
+        if record["seconds"] > previous["seconds"] * (1 + threshold) and record["seconds"] - previous["seconds"] > min_seconds:
+            regressions.append((record, previous, "seconds"))
+        if record["peak_mb"] > previous["peak_mb"] * (1 + threshold) and record["peak_mb"] - previous["peak_mb"] > min_mb:
+            regressions.append((record, previous, "peak_mb"))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks every processor and compares against a saved baseline.")
+    parser.add_argument("--processors", nargs="+", choices=list(SIZES), help="only run these processors")
+    parser.add_argument("--quick", action="store_true", help="leave out the largest size of each processor")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="the baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baseline instead of comparing")
+    parser.add_argument("--output", default="./Data_Analysis_Suite_Output_Files/benchmark_results.json", help="where the results are saved")
+    parser.add_argument("--repeats", type=int, default=2, help="timed runs of each size, the fastest is kept")
+    parser.add_argument("--threshold", type=float, default=0.25, help="slowdown or memory growth, as a fraction, that counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.processors, args.quick, args.repeats)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save-baseline first")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if (baseline.get("platform"), baseline.get("cpu_count")) != (results["platform"], results["cpu_count"]):
+        print(f"The baseline was measured on {baseline.get('platform')} with {baseline.get('cpu_count')} CPUs, timings may not be comparable")
+    regressions = find_regressions(results, baseline, args.threshold)
+    for record, previous, measure_name in regressions:
+        unit = "s" if measure_name == "seconds" else " MB"
+        print(f"REGRESSION {record['processor']} {record['size']} {record['unit']} {record['stage']}: "
+              f"{previous[measure_name]}{unit} -> {record[measure_name]}{unit}")
+    print(f"{len(regressions)} regressions against the baseline from {baseline.get('created')}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
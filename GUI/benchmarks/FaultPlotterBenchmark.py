@@ -0,0 +1,81 @@
+import os
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import plotly.graph_objects as go
+from FaultPlotter import FaultPlotter, COLORS
+from FaultAnomalyDetector import FaultAnomalyDetector
+from SyntheticData import generate_atom_alarm_summary
+from benchmarks.Timing import time_call
+
+def plot_per_fault_type(fault_counts, output_dir):
+    """
+    The previous rendering path, one plt.bar with a cumulative bottom and one go.Bar trace per fault type plus
+    one annotation per vehicle.
+    """
+    plt.figure(figsize=(18, 10))
+    fig = go.Figure()
+    bottom = None
+    for i, fault_type in enumerate(fault_counts.columns):
+        plt.bar(fault_counts.index.astype(str), fault_counts[fault_type], bottom=bottom, label=fault_type, color=COLORS[i % len(COLORS)])
+        bottom = fault_counts[fault_type].copy() if bottom is None else bottom + fault_counts[fault_type]
+        fig.add_trace(go.Bar(x=fault_counts.index.astype(str), y=fault_counts[fault_type], name=fault_type))
+    vehicle_totals = fault_counts.sum(axis=1)
+    plt.ylim(0, vehicle_totals.max() + 10)
+    for i, total in enumerate(vehicle_totals):
+        plt.text(i, total, f'{int(total)}', ha='center', va='bottom')
+    plt.xticks(rotation=90)
+    plt.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), title='Fault Types', ncol=4, fontsize='small')
+    plt.tight_layout(rect=[0, 0, 1, 0.95])
+    plt.savefig(os.path.join(output_dir, "Fault_Data_Plot.jpg"))
+    plt.close()
+    for i, total in enumerate(vehicle_totals):
+        fig.add_annotation(x=str(i), y=total, text=str(int(total)), showarrow=False, xref="x", yshift=10)
+    fig.update_layout(barmode='stack')
+    fig.write_html(os.path.join(output_dir, "Fault_Data_interactive.html"))
+
+def run_benchmark(vehicle_counts=(50, 200, 500), num_fault_types=60):
+    """
+    Compares the per fault type renderer against FaultPlotter.plot_faults for fleets of different sizes.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_file = os.path.join(temp_dir, 'alarm_summary.csv')
+        previous_dir = os.getcwd()
+        # plot_faults writes to ./Data_Analysis_Suite_Output_Files
+        os.chdir(temp_dir)
+        os.makedirs("Data_Analysis_Suite_Output_Files")
+        try:
+            print(f"{'Vehicles':>9} {'Fault types':>12} {'Per type (s)':>13} {'Vectorized (s)':>15} {'Speedup':>8}")
+            for num_vehicles in vehicle_counts:
+                generate_atom_alarm_summary(csv_file, num_vehicles, num_fault_types)
+                fault_plotter = FaultPlotter(csv_file)
+                per_type_time = time_call(lambda: plot_per_fault_type(fault_plotter.read_fault_counts(), temp_dir))[1]
+                with redirect_stdout(StringIO()):
+                    vectorized_time = time_call(fault_plotter.plot_faults, False)[1]
+                print(f"{num_vehicles:>9} {num_fault_types:>12} {per_type_time:>13.2f} {vectorized_time:>15.2f} {per_type_time / vectorized_time:>7.2f}x")
+        finally:
+            os.chdir(previous_dir)
+
+def run_anomaly_benchmark(num_days=365, num_vehicles=500, num_fault_types=60, seed=0):
+    """
+    Times FaultAnomalyDetector on a synthetic fleet history where a fifth of the (vehicle, fault type, day) cells have faults.
+    """
+    rng = np.random.default_rng(seed)
+    cells = np.flatnonzero(rng.random(num_days * num_vehicles * num_fault_types) < 0.2)
+    history = pd.DataFrame({
+        'Date': pd.Timestamp('2026-01-01') + pd.to_timedelta(cells // (num_vehicles * num_fault_types), 'D'),
+        'Vehicle Number': cells // num_fault_types % num_vehicles + 1,
+        'Fault Type': np.array([f"Vehicle Alarm {index:03d}" for index in range(num_fault_types)])[cells % num_fault_types],
+        'Fault Count': rng.integers(1, 6, len(cells)).astype(float)
+    })
+    seconds = time_call(lambda: FaultAnomalyDetector(history).rank_vehicles())[1]
+    print(f"{len(history)} history rows ({num_vehicles} vehicles, {num_fault_types} fault types, {num_days} days): {seconds:.2f}s")
+
+if __name__ == "__main__":
+    run_benchmark()
+    run_anomaly_benchmark()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from reportlab.lib import colors
+from BlindReceiverHighlighter import BFHighlighter
+from SyntheticData import generate_blind_receiver
+from benchmarks.Timing import time_call
+
+def render_per_line(BFH, rendered_rows, pdf_filename):
+    """
+    The previous rendering path, one drawString and one line call per row with page breaks found by decrementing y.
+    """
+    c = canvas.Canvas(pdf_filename, pagesize=letter)
+    width, height = letter
+    c.setFont("Courier", 10)
+    y_position = height - 40
+    line_height = 12
+    for i, row in enumerate(rendered_rows):
+        if i in BFH.crossed_rows:
+            c.setFillColor(colors.black)
+            c.setLineWidth(1)
+            offset = 2
+            c.line(30, y_position + line_height / 2 - offset, width, y_position + line_height / 2 - offset)
+        c.drawString(30, y_position, row)
+        y_position -= line_height
+        if y_position < 40:
+            c.showPage()
+            c.setFont("Courier", 10)
+            y_position = height - 40
+    c.save()
+
+def run_benchmark(section_counts=(100, 1000, 5000)):
+    """
+    Compares pages-per-second of the per-line renderer against the batched renderer in BFHighlighter.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rpt_file = os.path.join(temp_dir, 'trip.rpt')
+        pdf_file = os.path.join(temp_dir, 'trip.pdf')
+        print(f"{'Lines':>8} {'Pages':>6} {'Per-line pages/s':>17} {'Batched pages/s':>16} {'Speedup':>8} {'Highlighted only (s)':>21}")
+        for num_sections in section_counts:
+            num_lines = generate_blind_receiver(rpt_file, num_sections)
+            with redirect_stdout(StringIO()):
+                BFH = BFHighlighter(rpt_file)
+                BFH.find_highlight_rows()
+                rendered_rows = BFH.format_rows()
+                per_line_time = time_call(render_per_line, BFH, rendered_rows, pdf_file, repeats=3)[1]
+                batched_time = time_call(BFH.render_pdf, rendered_rows, pdf_file, repeats=3)[1]
+                highlighted_only_time = time_call(BFH.render_pdf, rendered_rows, pdf_file, True, repeats=3)[1]
+            num_pages = -(-num_lines // 60)
+            print(f"{num_lines:>8} {num_pages:>6} {num_pages / per_line_time:>17.1f} {num_pages / batched_time:>16.1f} "
+                  f"{per_line_time / batched_time:>7.2f}x {highlighted_only_time:>21.3f}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,42 @@
+import os
+import tempfile
+from FifoAnalyzer import FifoAnalyzer
+from MixIdentifier import MixIdentifier
+from SyntheticData import generate_pallet_history
+from benchmarks.Timing import time_call
+
+def count_jumped_pairwise(mix_identifier):
+    """
+    The naive way to find out of order pallets, comparing every visit with every earlier arrival.
+    """
+    departures = {to_position: from_position for to_position, from_position in mix_identifier.visits}
+    unpaired = set(mix_identifier.unpaired_arrivals)
+    pallets_jumped = []
+    for to_position, from_position in mix_identifier.visits:
+        # Earlier arrivals that had not left yet, or never left, apart from those whose departure is missing
+        pallets_jumped.append(sum(1 for earlier in range(to_position)
+                                  if earlier not in unpaired and departures.get(earlier, from_position + 1) > from_position))
+    return pallets_jumped
+
+def run_fifo_benchmark(move_counts=(1000, 10000, 100000), pairwise_limit=10000):
+    """
+    Times FifoAnalyzer on synthetic histories of one station, against the pairwise count for the smaller ones.
+    Most pallets wait for a few others only, so a station that has backed up (mix_rate 0.5) is used.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        text_file_path = os.path.join(temp_dir, 'pallet_history.txt')
+        print(f"{'Moves':>8} {'Visits':>8} {'Out of order':>13} {'Pairwise (s)':>13} {'Fenwick (s)':>12}")
+        for num_moves in move_counts:
+            generate_pallet_history(text_file_path, num_moves, mix_rate=0.5)
+            mix_identifier = MixIdentifier.from_file("AGVO_01", text_file_path)
+            mix_identifier.read_moves()
+            fifo_analyzer, fenwick_time = time_call(FifoAnalyzer, mix_identifier)
+            pairwise_text = "skipped"
+            if num_moves <= pairwise_limit:
+                pairwise_time = time_call(count_jumped_pairwise, mix_identifier)[1]
+                pairwise_text = f"{pairwise_time:.3f}"
+            out_of_order = sum(1 for pallets in fifo_analyzer.pallets_jumped if pallets > 0)
+            print(f"{num_moves:>8} {len(mix_identifier.visits):>8} {out_of_order:>13} {pairwise_text:>13} {fenwick_time:>12.3f}")
+
+if __name__ == "__main__":
+    run_fifo_benchmark()
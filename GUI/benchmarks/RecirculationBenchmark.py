@@ -0,0 +1,147 @@
+import os
+import re
+import csv
+import tempfile
+import tracemalloc
+from RecirculationProcessor import RecirculationProcessor, write_csv_columns
+from SyntheticData import generate_location_events
+from benchmarks.Timing import time_call, peak_memory
+
+def parse_readlines(input_file):
+    """
+    The previous parser, reads the whole export with readlines() and runs the regex on every line.
+    """
+    with open(input_file, "r") as file:
+        lines = file.readlines()
+    pattern = re.compile(r'^\s*(\w+)?\s+(\w+)\s+(Pallet Moved (From|To))\s+(\w+)\s+(\w+)\s+(.+?)\s+(\d{6})\s+(\d+)\s+(\d{2}/\d{2})\s+(\d{2}:\d{2})$')
+    num_events = 0
+    for line in lines:
+        match = pattern.match(line)
+        if match and match.group(3).strip() == "Pallet Moved To":
+            num_events += 1
+    return num_events
+
+def parse_streaming(input_file):
+    """
+    Counts the events yielded by RecirculationProcessor.read_events.
+    """
+    return sum(1 for _ in RecirculationProcessor(input_file).read_events())
+
+def measure(function, *args):
+    """
+    Returns (result, wall time in seconds, peak traced memory in MB) of the function.
+    The time and memory come from separate runs since tracing allocations slows the parser down.
+    """
+    result, elapsed = time_call(function, *args)
+    return result, elapsed, peak_memory(function, *args)
+
+def run_benchmark(event_counts=(10000, 100000, 1000000)):
+    """
+    Compares lines-per-second and peak memory of the readlines parser against the streaming parser.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rpt_file = os.path.join(temp_dir, 'location_events.rpt')
+        print(f"{'Lines':>9} {'readlines lines/s':>18} {'streaming lines/s':>18} {'Speedup':>8} {'readlines MB':>13} {'streaming MB':>13}")
+        for num_events in event_counts:
+            num_lines = generate_location_events(rpt_file, num_events)
+            old_events, old_time, old_peak = measure(parse_readlines, rpt_file)
+            new_events, new_time, new_peak = measure(parse_streaming, rpt_file)
+            assert old_events == new_events
+            print(f"{num_lines:>9} {num_lines / old_time:>18.0f} {num_lines / new_time:>18.0f} {old_time / new_time:>7.2f}x {old_peak:>13.1f} {new_peak:>13.1f}")
+
+def store_dict_rows(input_file):
+    """
+    The previous event storage, one 10 key dict per event grouped by pallet plus a "MM/DD HH:MM" string per event.
+    """
+    circulation_data = {}
+    datetime_entries = []
+    for location, operator, event, pallet_id, product, description, code_date, number_of_cases, date, time in RecirculationProcessor(input_file).read_events():
+        circulation_data.setdefault(pallet_id, []).append({
+            "Location": location, "Operator": operator, "Event": event, "Pallet ID": pallet_id, "Product": product,
+            "Description": description, "Code Date": code_date, "Number of Cases": number_of_cases, "Date": date, "Time": time
+        })
+        datetime_entries.append(f"{date} {time}")
+    return circulation_data, datetime_entries
+
+def store_columnar(input_file):
+    """
+    Stores the events in RecirculationProcessor's columnar CirculationEvents.
+    """
+    processor = RecirculationProcessor(input_file)
+    processor.add_events(processor.read_events())
+    return processor.events
+
+def run_memory_benchmark(num_events=1000000):
+    """
+    Compares the memory held per million events by the dict rows against CirculationEvents.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rpt_file = os.path.join(temp_dir, 'location_events.rpt')
+        generate_location_events(rpt_file, num_events)
+        for name, function in [("dict rows", store_dict_rows), ("columnar", store_columnar)]:
+            tracemalloc.start()
+            result = function(rpt_file)
+            held = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            num_stored = len(result[1]) if name == "dict rows" else len(result)
+            print(f"{name:>10}: {held / num_stored * 1e6 / (1024 * 1024):8.1f} MB per million events")
+            del result
+
+def run_parallel_benchmark(num_events=2000000, worker_counts=(1, 2, 4, 8)):
+    """
+    Compares sequential parsing against read_circulation_data_parallel with different numbers of workers.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rpt_file = os.path.join(temp_dir, 'location_events.rpt')
+        num_lines = generate_location_events(rpt_file, num_events)
+        processor = RecirculationProcessor(rpt_file)
+        sequential_time = time_call(processor.add_events, processor.read_events())[1]
+        print(f"{num_lines} lines, sequential: {sequential_time:.2f}s")
+        for max_workers in worker_counts:
+            processor = RecirculationProcessor(rpt_file)
+            parallel_time = time_call(processor.read_circulation_data_parallel, max_workers)[1]
+            print(f"{max_workers:>3} workers: {parallel_time:.2f}s ({sequential_time / parallel_time:.2f}x)")
+
+def write_csv_writer(file_path, columns):
+    """
+    The previous CSV output, csv.writer writing one row at a time.
+    """
+    with open(file_path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(columns)
+        writer.writerows(zip(*[column.tolist() for column in columns.values()]))
+
+def run_output_benchmark(num_events=3000000, num_pallets=400000):
+    """
+    Compares writing circulation_data_sorted rows with csv.writer against write_csv_columns, and times
+    the heap based top-K selection against the full sort.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rpt_file = os.path.join(temp_dir, 'location_events.rpt')
+        generate_location_events(rpt_file, num_events, num_pallets)
+        processor = RecirculationProcessor(rpt_file)
+        processor.load_events()
+        events = processor.events
+        (order, circulation_numbers), sort_time = time_call(events.recirculations)
+        (dates, times), format_time = time_call(events.format_timestamps, events.column("Timestamp")[order])
+        print(f"{len(order)} rows, sorting and formatting: {sort_time + format_time:.2f}s")
+        columns = {
+            'Pallet ID': events.values("Pallet ID", order),
+            'Product ID': events.values("Product", order),
+            'Circulation Number': circulation_numbers,
+            'Location (Inflow)': events.values("Location", order),
+            'Date': dates,
+            'Time': times
+        }
+        for name, function in [("csv.writer", write_csv_writer), ("write_csv_columns", write_csv_columns)]:
+            seconds = time_call(function, os.path.join(temp_dir, 'sorted.csv'), columns)[1]
+            print(f"{name:>18}: {seconds:.2f}s")
+        for top_k in [None, 100]:
+            seconds = time_call(events.recirculations, top_k)[1]
+            print(f"{'all pallets' if top_k is None else f'top {top_k} pallets':>18}: {seconds:.3f}s")
+
+if __name__ == "__main__":
+    run_benchmark()
+    run_memory_benchmark()
+    run_parallel_benchmark()
+    run_output_benchmark()
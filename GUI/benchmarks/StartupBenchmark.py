@@ -0,0 +1,98 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from ProcessorRegistry import processors
+from SyntheticData import generate_pallet_history
+from benchmarks.Timing import best_of
+
+GUI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROCESSOR_MODULES = processors.module_names()
+
+def time_import(module_names):
+    """
+    Returns how long importing the modules takes in a fresh interpreter, in seconds.
+    """
+    code = f"import time; start = time.perf_counter(); import {', '.join(module_names)}; print(time.perf_counter() - start)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=GUI_DIR, capture_output=True, text=True, check=True).stdout
+    return float(output.strip())
+
+def run_gui(command, extra_env=None, timeout=120):
+    """
+    Starts the GUI in benchmark mode in an empty folder, see GUI.report_startup.
+
+    :return: (seconds until the window was drawn, seconds from the click to the first result or None), None if the
+             window did not show (e.g. there is no display).
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        report_file = os.path.join(temp_dir, "startup_report.txt")
+        env = dict(os.environ, DATA_ANALYSIS_SUITE_STARTUP_BENCHMARK=report_file, **(extra_env or {}))
+        start = time.time()
+        result = subprocess.run(command, cwd=temp_dir, env=env, capture_output=True, timeout=timeout)
+        if not os.path.exists(report_file):
+            error_lines = result.stderr.decode(errors='replace').strip().splitlines()
+            print(f"The window did not show: {error_lines[-1] if error_lines else 'no error output'}")
+            return None
+        with open(report_file) as file:
+            window_time, result_seconds = file.read().splitlines()
+        return float(window_time) - start, float(result_seconds) if result_seconds else None
+
+def time_to_first_window(command):
+    """
+    Returns the seconds until the window of the GUI has been drawn, None if it did not show.
+    """
+    times = run_gui(command)
+    return None if times is None else times[0]
+
+def time_to_first_result(command, click_delay=3, num_moves=2000):
+    """
+    Returns the seconds from clicking Pallet History, click_delay seconds after the window shows, until its outputs are
+    written, None if the window did not show or the job failed. This includes starting the worker process and importing
+    the processors in it unless the GUI did so in advance.
+    """
+    with tempfile.TemporaryDirectory() as input_dir:
+        input_path = os.path.join(input_dir, "pallet_history.txt")
+        generate_pallet_history(input_path, num_moves)
+        times = run_gui(command, {"DATA_ANALYSIS_SUITE_BENCHMARK_INPUT": input_path,
+                                  "DATA_ANALYSIS_SUITE_BENCHMARK_CLICK_DELAY": str(click_delay)})
+    if times is not None and times[1] is None:
+        print("The first job failed")
+    return None if times is None else times[1]
+
+def run_benchmark(frozen_executable=None, repeats=3):
+    """
+    Measures the time to the first window of the source GUI, of the GUI with every processor imported up front as it
+    was before the processor registry, and of the PyInstaller build if there is one. Then the time from the first click
+    to its result, with and without warming up the processors after the window shows.
+
+    :param frozen_executable: The built app, by default dist/Data_Analysis_Suite(.exe) in the GUI folder.
+    :param repeats: Runs of each, the best is reported.
+    """
+    print(f"Importing the processors: {best_of(time_import, PROCESSOR_MODULES, repeats=repeats):.2f}s")
+    print(f"Importing Data_Analysis_Suite: {best_of(time_import, ['Data_Analysis_Suite'], repeats=repeats):.2f}s")
+
+    eager_code = f"import sys; sys.path.insert(0, {GUI_DIR!r}); import {', '.join(PROCESSOR_MODULES)}; import Data_Analysis_Suite; Data_Analysis_Suite.GUI()"
+    cold_code = f"import sys; sys.path.insert(0, {GUI_DIR!r}); import Data_Analysis_Suite; Data_Analysis_Suite.GUI(warm_up=False)"
+    if frozen_executable is None:
+        frozen_executable = os.path.join(GUI_DIR, "dist", "Data_Analysis_Suite.exe" if sys.platform == "win32" else "Data_Analysis_Suite")
+    commands = [
+        ("Source, lazy processors", [sys.executable, os.path.join(GUI_DIR, "Data_Analysis_Suite.py")]),
+        ("Source, processors imported up front", [sys.executable, "-c", eager_code]),
+    ]
+    if os.path.exists(frozen_executable):
+        commands.append(("PyInstaller build", [frozen_executable]))
+    else:
+        print(f"No PyInstaller build at {frozen_executable}, build it with pyinstaller Data_Analysis_Suite.spec to include it")
+
+    for name, command in commands:
+        seconds = best_of(time_to_first_window, command, repeats=repeats)
+        print(f"Time to first window, {name}: " + ("window did not show" if seconds is None else f"{seconds:.2f}s"))
+
+    source_command = commands[0][1]
+    for name, command in [("warmed up", source_command), ("without warm-up", [sys.executable, "-c", cold_code])]:
+        seconds = best_of(time_to_first_result, command, repeats=repeats)
+        print(f"Time from first click to result, {name}: " + ("no result" if seconds is None else f"{seconds:.2f}s"))
+
+if __name__ == "__main__":
+    run_benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,46 @@
+import time
+import tracemalloc
+
+def time_call(function, *args, repeats=1):
+    """
+    Runs the function a few times.
+
+    :return: A tuple of (result of the last run, best wall time in seconds).
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def peak_memory(function, *args):
+    """
+    Returns the peak memory traced while the function runs, in MB. Tracing slows pure Python code down, so time the
+    function in a separate run.
+    """
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+def best_of(measurement, *args, repeats=3):
+    """
+    Runs a function that measures something itself a few times and keeps the lowest value, for functions that run the
+    timed code in another process.
+
+    :param measurement: Returns a number, or a dictionary of numbers in which case the lowest of every key is kept.
+    :return: The lowest value, None as soon as one run returns None.
+    """
+    values = []
+    for _ in range(repeats):
+        value = measurement(*args)
+        if value is None:
+            return None
+        values.append(value)
+    if isinstance(values[0], dict):
+        return {key: min(value[key] for value in values) for key in values[0]}
+    return min(values)
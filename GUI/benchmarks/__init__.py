@@ -0,0 +1,12 @@
+"""
+Benchmarks of the Data Analysis Suite processors. They import the processors by module name like the GUI does, so run
+them as modules from the GUI folder:
+
+    python -m benchmarks.BenchmarkSuite          # every processor, compared against a saved baseline
+    python -m benchmarks.StartupBenchmark        # time to the first window and to the first result
+    python -m benchmarks.RecirculationBenchmark  # and the other <Processor>Benchmark modules, old against new code paths
+
+The <Processor>Benchmark modules keep the code paths that were replaced, the "previous" functions, as the reference
+the current ones are measured against. That they give the same results is checked by the tests in GUI/tests, which
+use the pairwise FIFO count of PalletHistoryBenchmark as their reference too.
+"""
@@ -0,0 +1,22 @@
+import os
+import sys
+import webbrowser
+import matplotlib
+import pytest
+
+# The tests import the processors by module name like the GUI does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+matplotlib.use('Agg')
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    """
+    Runs the test in an empty folder, the processors write to ./Data_Analysis_Suite_Output_Files and nothing is opened
+    in the browser.
+
+    :return: The path of the output folder.
+    """
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("Data_Analysis_Suite_Output_Files")
+    monkeypatch.setattr(webbrowser, "open_new", lambda *args, **kwargs: None)
+    return tmp_path / "Data_Analysis_Suite_Output_Files"
@@ -0,0 +1,17 @@
+import json
+import os
+import pytest
+from BlindReceiverHighlighter import BFHighlighter
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# The expected rows, crossed out rows and messages were written by the highlighter these replaced
+@pytest.mark.parametrize("name", ["blind_receiver", "blind_receiver_no_negative"])
+def test_highlighting_matches_baseline(output_dir, capsys, name):
+    with open(os.path.join(DATA_DIR, f"{name}_expected.json")) as expected_file:
+        expected = json.load(expected_file)
+    highlighter = BFHighlighter(os.path.join(DATA_DIR, f"{name}.rpt"))
+    highlighter.highlight_rows_in_pdf(str(output_dir / "Blind_Receiver_highlighted.pdf"))
+    assert capsys.readouterr().out == expected["printed"]
+    assert highlighter.format_rows() == expected["rows"]
+    assert sorted(highlighter.crossed_rows) == expected["crossed_rows"]
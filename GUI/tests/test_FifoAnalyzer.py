@@ -0,0 +1,37 @@
+import pytest
+from FifoAnalyzer import FifoAnalyzer
+from MixIdentifier import MixIdentifier
+from SyntheticData import generate_pallet_history
+from benchmarks.PalletHistoryBenchmark import count_jumped_pairwise
+
+def pallet_history(moves):
+    """
+    Writes Pallet History text for (time, pallet ID, from location, to location) moves.
+    """
+    return "\n".join(f"EVT1 Jul 13 {time} I-OPRMOVMOV\n"
+                     f"EVT2 Opr AGV19 Moved Moveable {pallet_id} From {from_location} (Type T) To {to_location} (Type S) With 48 Of 06508801 (070124) Shift: C"
+                     for time, pallet_id, from_location, to_location in moves)
+
+@pytest.mark.parametrize("num_moves, mix_rate, seed", [(200, 0.0, 0), (1000, 0.1, 1), (2000, 0.5, 2)])
+def test_matches_pairwise_count(tmp_path, num_moves, mix_rate, seed):
+    text_file_path = tmp_path / "pallet_history.txt"
+    generate_pallet_history(text_file_path, num_moves, mix_rate=mix_rate, seed=seed)
+    mix_identifier = MixIdentifier.from_file("AGVO_01", text_file_path)
+    mix_identifier.read_moves()
+    fifo_analyzer = FifoAnalyzer(mix_identifier)
+    assert fifo_analyzer.pallets_jumped == count_jumped_pairwise(mix_identifier)
+    assert fifo_analyzer.inversions == sum(fifo_analyzer.pallets_jumped)
+
+def test_arrival_without_departure_is_left_out():
+    # B arrives twice without leaving in between, when it leaves only A counts as jumped, not its own first arrival
+    mix_identifier = MixIdentifier("AGVO_01", pallet_history([
+        ("15:00:00", "PALLETA", "AGV19", "AGVO_01"),
+        ("15:01:00", "PALLETB", "AGV19", "AGVO_01"),
+        ("15:02:00", "PALLETB", "AGV19", "AGVO_01"),
+        ("15:03:00", "PALLETB", "AGVO_01", "FORK_21"),
+        ("15:04:00", "PALLETA", "AGVO_01", "FORK_21"),
+    ]))
+    mix_identifier.read_moves()
+    fifo_analyzer = FifoAnalyzer(mix_identifier)
+    assert fifo_analyzer.unpaired_arrivals == 1
+    assert fifo_analyzer.pallets_jumped == count_jumped_pairwise(mix_identifier) == [1, 0]
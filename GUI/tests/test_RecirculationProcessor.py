@@ -0,0 +1,55 @@
+import os
+import shutil
+from datetime import datetime
+import numpy as np
+import pytest
+from RecirculationProcessor import RecirculationProcessor, CirculationEvents
+from RecirculationHistory import RecirculationHistory
+from SyntheticData import generate_location_events
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+@pytest.fixture
+def location_events(output_dir):
+    """
+    Copies the Location Event export the expected output was written from, dated at the end of the year its events
+    are in since the export has no year.
+    """
+    rpt_file_path = os.path.join(output_dir.parent, "location_events.rpt")
+    shutil.copy(os.path.join(DATA_DIR, "location_events.rpt"), rpt_file_path)
+    exported_at = datetime(2026, 12, 31).timestamp()
+    os.utime(rpt_file_path, (exported_at, exported_at))
+    return rpt_file_path
+
+def read_text(file_path):
+    with open(file_path, newline='') as file:
+        return file.read()
+
+def test_parallel_parsing_matches_sequential(tmp_path):
+    rpt_file_path = tmp_path / "location_events.rpt"
+    generate_location_events(rpt_file_path, 5000, seed=1)
+    sequential = RecirculationProcessor(rpt_file_path)
+    sequential.load_events(parallel=False)
+    parallel = RecirculationProcessor(rpt_file_path)
+    parallel.MIN_CHUNK_BYTES = 4096  # many chunks, most of them starting in the middle of a location's rows
+    parallel.load_events(parallel=True, max_workers=2)
+    assert len(parallel.events) == len(sequential.events) > 0
+    for column in CirculationEvents.TEXT_COLUMNS:
+        assert (parallel.events.values(column) == sequential.events.values(column)).all()
+    assert np.array_equal(parallel.events.column("Timestamp"), sequential.events.column("Timestamp"))
+    assert np.array_equal(parallel.events.column("Number of Cases"), sequential.events.column("Number of Cases"))
+
+def test_sorted_csv_matches_baseline(location_events):
+    processor = RecirculationProcessor(location_events)
+    processor.load_events()
+    output_file = processor.write_sorted_csv(open_csv=False, show=False)
+    assert read_text(output_file) == read_text(os.path.join(DATA_DIR, "circulation_data_sorted_expected.csv"))
+
+def test_sorted_csv_from_history_matches_baseline(location_events, output_dir):
+    history = RecirculationHistory(str(output_dir / "recirculation_history.db"))
+    try:
+        history.ingest(location_events)
+        output_file = history.create_sorted_csv(show=False)
+    finally:
+        history.close()
+    assert read_text(output_file) == read_text(os.path.join(DATA_DIR, "circulation_data_sorted_expected.csv"))